@@ -1,33 +1,39 @@
 import re
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import JSONResponse
-from pydantic import EmailStr, BaseModel, Field, validator
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import EmailStr, BaseModel, ConfigDict, Field, field_validator
 from typing import Optional, List
 from datetime import datetime
 
+from app.core.ratelimit import rate_limit
+from app.core.security import get_current_admin_user
+from app.core.serialization import json_response
+from app.services.contact_feed_service import contact_feed
 
+
+# Префикс /api/v1/contacts задаётся при подключении в app.main
 router = APIRouter(
-    prefix="/api/v1/contacts",
     tags=["Contacts"],
     responses={404: {"description": "Not found"}}
 )
 
 
 class ContactBase(BaseModel):
-    name: str = Field(..., min_length=2, max_length=50, example="Иван Иванов")
-    email: EmailStr = Field(..., example="user@example.com")
+    name: str = Field(..., min_length=2, max_length=50, examples=["Иван Иванов"])
+    email: EmailStr = Field(..., examples=["user@example.com"])
     phone: Optional[str] = Field(
         None,
         min_length=10,
         max_length=20,
-        example="+79991234567",
-        regex=r"^\+?[0-9\s\-\(\)]+$"
+        examples=["+79991234567"],
+        pattern=r"^\+?[0-9\s\-\(\)]+$"
     )
-    message: Optional[str] = Field(None, max_length=1000, example="Хочу связаться")
+    message: Optional[str] = Field(None, max_length=1000, examples=["Хочу связаться"])
 
 
-    @validator('phone')
+    @field_validator('phone')
+    @classmethod
     def validate_phone(cls, v):
         if v is None:
             return v
@@ -46,8 +52,7 @@ class ContactResponse(ContactBase):
     created_at: datetime
     is_processed: bool = False
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ContactStorage:
@@ -56,14 +61,22 @@ class ContactStorage:
         self.next_id = 1
 
     def add_contact(self, contact: ContactCreate) -> ContactResponse:
-        contact_data = contact.dict()
+        contact_data = contact.model_dump()
         contact_data["id"] = self.next_id
         contact_data["created_at"] = datetime.now()
         contact_data["is_processed"] = False
         self.contacts.append(contact_data)
         self.next_id += 1
+        contact_feed.publish_contact("contact.created", contact_data)
         return contact_data
 
+    def mark_processed(self, contact_id: int) -> Optional[ContactResponse]:
+        contact = self.get_contact(contact_id)
+        if contact is not None and not contact["is_processed"]:
+            contact["is_processed"] = True
+            contact_feed.publish_contact("contact.processed", contact)
+        return contact
+
     def get_contact(self, contact_id: int) -> Optional[ContactResponse]:
         return next((c for c in self.contacts if c["id"] == contact_id), None)
 
@@ -90,7 +103,9 @@ def get_contact_storage():
     response_model=ContactResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Отправить контактную форму",
-    response_description="Созданный контакт"
+    response_description="Созданный контакт",
+    dependencies=[Depends(rate_limit("contacts"))],
+    responses={429: {"description": "Слишком много запросов"}}
 )
 async def create_contact(
     contact: ContactCreate,
@@ -124,7 +139,32 @@ async def create_contact(
 async def read_contacts(
     storage: ContactStorage = Depends(get_contact_storage)
 ):
-    return storage.get_all()
+    return json_response(List[ContactResponse], storage.get_all())
+
+
+@router.get(
+    "/stream",
+    response_class=StreamingResponse,
+    summary="Новые и обработанные контакты (Server-Sent Events)",
+    dependencies=[Depends(get_current_admin_user)],
+    responses={200: {"content": {"text/event-stream": {}}}}
+)
+async def stream_contacts(last_event_id: Optional[str] = Header(None)):
+    """
+    Поток событий `contact.created` и `contact.processed`.
+
+    После переподключения браузер сам присылает `Last-Event-ID`, и поток
+    продолжается с пропущенных событий. Событие `reset` означает, что
+    пропущено слишком много и список нужно перечитать через `GET /`.
+    Только для администраторов: токен передаётся в заголовке Authorization,
+    поэтому клиенту нужен SSE поверх fetch, а не EventSource.
+    """
+    resume_from = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    return StreamingResponse(
+        contact_feed.stream(resume_from),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.get(
@@ -143,7 +183,27 @@ async def read_contact(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Contact not found"
         )
-    return contact
+    return json_response(ContactResponse, contact)
+
+
+@router.post(
+    "/{contact_id}/processed",
+    response_model=ContactResponse,
+    summary="Отметить контакт обработанным",
+    dependencies=[Depends(get_current_admin_user)],
+    responses={404: {"description": "Контакт не найден"}}
+)
+async def process_contact(
+    contact_id: int,
+    storage: ContactStorage = Depends(get_contact_storage)
+):
+    contact = storage.mark_processed(contact_id)
+    if not contact:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Contact not found"
+        )
+    return json_response(ContactResponse, contact)
 
 
 @router.delete(
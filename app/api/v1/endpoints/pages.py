@@ -1,25 +1,69 @@
-from fastapi import APIRouter, Depends, HTTPException
-from app.services.page_service import PageService
-from app.schemas.page import PageResponse, PageCreate
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.services.page_service import PageService, get_page_service
+from app.core.security import get_current_active_user
+from app.models import User
+from app.schemas.page import PageResponse, PageCreate, PageWithMeta
+from app.db.models import PageSearchResults
+from app.core.serialization import json_response, projection
+from typing import List, Optional, FrozenSet
 
 
-router = APIRouter(prefix="/pages", tags=["Pages"])
+# Префикс /api/v1/pages задаётся при подключении в app.main
+router = APIRouter(tags=["Pages"])
 
 
-@router.get("/", response_model=List[PageResponse])
-async def get_all_pages(service: PageService = Depends()):
-    return service.get_all()
+def page_fields(
+    fields: Optional[str] = Query(
+        None,
+        description="Поля ответа через запятую, например id,title,slug,updated_at"
+    )
+) -> Optional[FrozenSet[str]]:
+    if fields is None:
+        return None
+    requested = frozenset(name.strip() for name in fields.split(",") if name.strip())
+    unknown = requested - PageWithMeta.model_fields.keys()
+    if not requested or unknown:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}" if unknown else "No fields requested"
+        )
+    return requested
 
 
-@router.get("/{page_slug}", response_model=PageResponse)
-async def get_page(page_slug: str, service: PageService = Depends()):
-    page = service.get_by_slug(page_slug)
-    if not page:
-        raise HTTPException(status_code=404, detail="Page not found")
-    return page
+@router.get("/", response_model=List[PageWithMeta])
+async def get_all_pages(
+    fields: Optional[FrozenSet[str]] = Depends(page_fields),
+    service: PageService = Depends(get_page_service)
+):
+    pages = await service.list_published_pages(fields)
+    return json_response(List[projection(PageWithMeta, fields)], pages, validated=True)
+
+
+@router.get("/search", response_model=PageSearchResults)
+async def search_pages(
+    q: str = Query(..., min_length=1, max_length=200),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    service: PageService = Depends(get_page_service)
+):
+    results = await service.search_pages(q, skip=skip, limit=limit)
+    return json_response(PageSearchResults, results, validated=True)
+
+
+@router.get("/{page_slug}", response_model=PageWithMeta)
+async def get_page(
+    page_slug: str,
+    fields: Optional[FrozenSet[str]] = Depends(page_fields),
+    service: PageService = Depends(get_page_service)
+):
+    page = await service.get_page_by_slug(page_slug, fields)
+    return json_response(projection(PageWithMeta, fields), page, validated=True)
 
 
 @router.post("/", response_model=PageResponse)
-async def create_page(page_data: PageCreate, service: PageService = Depends()):
-    return service.create(page_data)
+async def create_page(
+    page_data: PageCreate,
+    current_user: User = Depends(get_current_active_user),
+    service: PageService = Depends(get_page_service)
+):
+    return await service.create_page(page_data, current_user)
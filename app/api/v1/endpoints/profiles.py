@@ -0,0 +1,34 @@
+from typing import List, Dict, Any
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+
+from app.core.profiling import profile_store
+from app.core.security import get_current_admin_user
+
+
+router = APIRouter(
+    prefix="/admin/profiles",
+    tags=["Profiling"],
+    dependencies=[Depends(get_current_admin_user)]
+)
+
+
+@router.get("/", summary="Список сохранённых профилей")
+async def list_profiles() -> List[Dict[str, Any]]:
+    return profile_store.list()
+
+
+@router.get(
+    "/{profile_id}",
+    summary="Скачать профиль в формате pstats",
+    responses={404: {"description": "Профиль не найден"}}
+)
+async def download_profile(profile_id: str):
+    path = profile_store.path(profile_id)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return FileResponse(path, media_type="application/octet-stream", filename=profile_id)
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.serialization import json_response
+from app.db.session import SessionLocal
+from app.schemas.page import PageWithMeta
+from app.services.page_service import PageService, get_page_service
+from app.services.sitemap_service import CachedDocument, site_index
+
+
+router = APIRouter(tags=["SEO"])
+
+
+def cached_response(request: Request, document: CachedDocument) -> Response:
+    headers = {
+        "ETag": document.etag,
+        "Cache-Control": "public, max-age=300",
+    }
+    if_none_match = request.headers.get("if-none-match", "")
+    if document.etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=document.body, media_type=document.media_type, headers=headers)
+
+
+async def ensure_site_index() -> None:
+    if not site_index.fresh:
+        await run_in_threadpool(site_index.ensure_loaded, SessionLocal)
+
+
+@router.get("/sitemap.xml", include_in_schema=False)
+async def sitemap(request: Request):
+    await ensure_site_index()
+    return cached_response(request, site_index.sitemap())
+
+
+@router.get("/sitemaps/sitemap-{chunk}.xml", include_in_schema=False)
+async def sitemap_chunk(chunk: int, request: Request):
+    await ensure_site_index()
+    document = site_index.sitemap_chunk(chunk)
+    if document is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sitemap not found")
+    return cached_response(request, document)
+
+
+@router.get("/feed.xml", include_in_schema=False)
+async def feed(request: Request):
+    await ensure_site_index()
+    return cached_response(request, site_index.feed())
+
+
+# Адрес, на который ссылаются <loc> в sitemap и <link> в ленте: без авторизации,
+# только опубликованные страницы
+@router.get(settings.PAGE_URL_TEMPLATE, name="public_page", response_model=PageWithMeta)
+async def public_page(slug: str, service: PageService = Depends(get_page_service)):
+    page = await service.get_page_by_slug(slug)
+    return json_response(PageWithMeta, page, validated=True)
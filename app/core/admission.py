@@ -0,0 +1,174 @@
+import asyncio
+import json
+from collections import deque
+from typing import Deque, Dict, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+EXEMPT_PATHS = frozenset({"/health", "/metrics", settings.API_V1_STR + "/contacts/stream"})
+EXEMPT_PREFIXES = ("/static/", "/assets/")
+
+OVERLOADED_BODY = json.dumps({"detail": "Server is overloaded, retry later"}).encode()
+
+
+class ConcurrencyLimiter:
+    """Не больше `limit` одновременных владельцев и очередь ожидающих по FIFO.
+
+    Очередь ограничена: когда она полна, `acquire` сразу возвращает False.
+    Освободившееся место передаётся первому в очереди напрямую, поэтому
+    новый запрос не может обогнать ждущих.
+    """
+
+    def __init__(self, limit: int, queue_size: int):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.in_flight = 0
+        self.shed = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+
+    async def acquire(self, deadline: float) -> bool:
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return True
+        if len(self._waiters) >= self.queue_size:
+            self.shed += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            async with asyncio.timeout_at(deadline):
+                await waiter
+            return True
+        except TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # Место передали в тот же момент, когда истёк срок
+                return True
+            self.shed += 1
+            return False
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Место уже передано, но запрос отменён — отдаём его следующему
+                self.release()
+            raise
+        finally:
+            if not waiter.done():
+                waiter.cancel()
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+
+class AdmissionMiddleware:
+    """Ограничение одновременных запросов: общий лимит и лимит класса маршрутов.
+
+    Запрос сначала занимает место в своём классе (auth, writes, reads), затем
+    в общем лимите. Если места нет дольше `queue_timeout`, или очередь полна,
+    сразу отвечает 503 — лучше быстро отказать части запросов, чем держать
+    все в очереди, пока они не станут бесполезны клиенту. Health-check,
+    метрики, статика и SSE-потоки в лимит не входят.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_in_flight: int = None,
+        class_limits: Dict[str, int] = None,
+        queue_size: int = None,
+        queue_timeout: float = None
+    ):
+        self.app = app
+        queue_size = queue_size if queue_size is not None else settings.ADMISSION_QUEUE_SIZE
+        self.queue_timeout = queue_timeout if queue_timeout is not None else settings.ADMISSION_QUEUE_TIMEOUT
+        self.global_limiter = ConcurrencyLimiter(
+            max_in_flight or settings.ADMISSION_MAX_IN_FLIGHT, queue_size
+        )
+        self.class_limiters = {
+            name: ConcurrencyLimiter(limit, queue_size)
+            for name, limit in (class_limits or settings.ADMISSION_CLASS_LIMITS).items()
+        }
+        self.auth_prefix = settings.API_V1_STR + "/auth"
+
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self._exempt(scope):
+            await self.app(scope, receive, send)
+            return
+
+        limiters = self._limiters(scope)
+        deadline = asyncio.get_running_loop().time() + self.queue_timeout
+        acquired = []
+        try:
+            for limiter in limiters:
+                if not await limiter.acquire(deadline):
+                    await self._reject(send)
+                    return
+                acquired.append(limiter)
+            await self.app(scope, receive, send)
+        finally:
+            for limiter in reversed(acquired):
+                limiter.release()
+
+
+    def route_class(self, scope: Scope) -> str:
+        if scope["path"].startswith(self.auth_prefix):
+            return "auth"
+        if scope["method"] not in SAFE_METHODS:
+            return "writes"
+        return "reads"
+
+
+    def stats(self) -> Dict[str, Tuple[int, int, int]]:
+        """{класс: (in_flight, queued, shed)}"""
+        limiters = {"global": self.global_limiter, **self.class_limiters}
+        return {
+            name: (limiter.in_flight, limiter.queued, limiter.shed)
+            for name, limiter in limiters.items()
+        }
+
+
+    def _limiters(self, scope: Scope) -> list:
+        limiter = self.class_limiters.get(self.route_class(scope))
+        return [limiter, self.global_limiter] if limiter else [self.global_limiter]
+
+
+    @staticmethod
+    def _exempt(scope: Scope) -> bool:
+        # SSE-поток исключён по маршруту, а не по заголовку Accept: иначе любой
+        # клиент обходил бы лимит, а долгое подключение занимало бы место навсегда
+        path = scope["path"]
+        return path.rstrip("/") in EXEMPT_PATHS or path.startswith(EXEMPT_PREFIXES)
+
+
+    @staticmethod
+    async def _reject(send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(OVERLOADED_BODY)).encode()),
+                (b"retry-after", b"1"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": OVERLOADED_BODY})
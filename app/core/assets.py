@@ -0,0 +1,220 @@
+import gzip
+import hashlib
+import json
+import os
+import stat
+from mimetypes import guess_type
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, Optional
+
+import anyio.to_thread
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles, NotModifiedResponse
+from starlette.types import Scope
+
+from app.core.config import settings
+
+
+COMPRESSIBLE_SUFFIXES = {".css", ".js", ".svg", ".html", ".json", ".txt", ".xml", ".map"}
+MIN_COMPRESS_SIZE = 256
+MANIFEST_NAME = "manifest.json"
+
+
+@dataclass
+class Asset:
+    logical_path: str
+    fingerprinted_path: str
+    source: str
+    digest: str
+    gzip_path: Optional[str] = None
+    size: int = 0
+    mtime_ns: int = 0
+
+
+def fingerprint(path: str, digest: str) -> str:
+    stem, dot, suffix = path.rpartition(".")
+    if not dot or "/" in suffix:
+        return f"{path}.{digest}"
+    return f"{stem}.{digest}.{suffix}"
+
+
+def accepts_gzip(headers: Headers) -> bool:
+    for part in headers.get("accept-encoding", "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip().lower() not in ("gzip", "*"):
+            continue
+        params = params.strip().replace(" ", "")
+        return params not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+class AssetManifest:
+
+    def __init__(self, roots: Dict[str, Path], build_dir: Path):
+        self.roots = roots
+        self.build_dir = build_dir
+        self.assets: Dict[str, Asset] = {}
+        self.by_fingerprint: Dict[str, Asset] = {}
+
+
+    def build(self) -> "AssetManifest":
+        # Файлы, не изменившиеся с прошлой сборки, берутся из manifest.json без хеширования
+        previous = self._read_manifest()
+        assets = {}
+        for prefix, root in self.roots.items():
+            if not root.is_dir():
+                continue
+            for dirpath, _, filenames in os.walk(root):
+                for filename in sorted(filenames):
+                    source = Path(dirpath) / filename
+                    relative = source.relative_to(root).as_posix()
+                    logical_path = f"{prefix}/{relative}"
+                    cached = previous.get(logical_path)
+                    if cached is not None and self._is_fresh(cached, source):
+                        assets[logical_path] = cached
+                    else:
+                        assets[logical_path] = self._build_asset(logical_path, source)
+
+        self.assets = assets
+        self.by_fingerprint = {a.fingerprinted_path: a for a in assets.values()}
+        self._write_manifest()
+        return self
+
+
+    def add(self, logical_path: str, source: Path) -> Asset:
+        asset = self._build_asset(logical_path, source)
+        self.assets[logical_path] = asset
+        self.by_fingerprint[asset.fingerprinted_path] = asset
+        self._write_manifest()
+        return asset
+
+
+    def _build_asset(self, logical_path: str, source: Path) -> Asset:
+        stat_result = source.stat()
+        data = source.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        asset = Asset(
+            logical_path=logical_path,
+            fingerprinted_path=fingerprint(logical_path, digest),
+            source=str(source),
+            digest=digest,
+            size=stat_result.st_size,
+            mtime_ns=stat_result.st_mtime_ns
+        )
+        if source.suffix.lower() in COMPRESSIBLE_SUFFIXES and len(data) >= MIN_COMPRESS_SIZE:
+            gzip_file = self.build_dir / f"{asset.fingerprinted_path}.gz"
+            if not gzip_file.exists():
+                compressed = gzip.compress(data, compresslevel=9, mtime=0)
+                if len(compressed) >= len(data):
+                    return asset
+                gzip_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = gzip_file.with_name(gzip_file.name + ".tmp")
+                tmp_file.write_bytes(compressed)
+                os.replace(tmp_file, gzip_file)
+            asset.gzip_path = str(gzip_file)
+        return asset
+
+
+    def _is_fresh(self, asset: Asset, source: Path) -> bool:
+        try:
+            stat_result = source.stat()
+        except FileNotFoundError:
+            return False
+        if (stat_result.st_size, stat_result.st_mtime_ns) != (asset.size, asset.mtime_ns):
+            return False
+        return asset.source == str(source) and (asset.gzip_path is None or os.path.exists(asset.gzip_path))
+
+
+    def _read_manifest(self) -> Dict[str, Asset]:
+        try:
+            data = json.loads((self.build_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+            return {path: Asset(**entry) for path, entry in data.items()}
+        except (FileNotFoundError, ValueError, TypeError):
+            return {}
+
+
+    def _write_manifest(self) -> None:
+        self.build_dir.mkdir(parents=True, exist_ok=True)
+        manifest = {path: asdict(asset) for path, asset in sorted(self.assets.items())}
+        tmp_file = self.build_dir / (MANIFEST_NAME + ".tmp")
+        tmp_file.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        os.replace(tmp_file, self.build_dir / MANIFEST_NAME)
+
+
+    def url_for(self, path: str) -> str:
+        path = path.lstrip("/")
+        asset = self.assets.get(path)
+        if asset is None:
+            return f"/{path}"
+        return f"/{asset.fingerprinted_path}"
+
+
+    def resolve(self, prefix: str, path: str) -> Optional[Asset]:
+        return self.by_fingerprint.get(f"{prefix}/{path}")
+
+
+class FingerprintedStaticFiles(StaticFiles):
+    """StaticFiles с поддержкой отпечатков, gzip-вариантов и immutable-кэширования"""
+
+    def __init__(self, *, manifest: AssetManifest, prefix: str, **kwargs):
+        super().__init__(**kwargs)
+        self.manifest = manifest
+        self.prefix = prefix
+
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405)
+
+        asset = self.manifest.resolve(self.prefix, Path(path).as_posix())
+        if asset is None:
+            response = await super().get_response(path, scope)
+            response.headers.setdefault("cache-control", "no-cache")
+            return response
+
+        request_headers = Headers(scope=scope)
+        headers = {
+            "cache-control": f"public, max-age={settings.ASSET_MAX_AGE}, immutable",
+            "etag": f'"{asset.digest}"',
+        }
+        full_path = asset.source
+        if asset.gzip_path:
+            headers["vary"] = "Accept-Encoding"
+            if accepts_gzip(request_headers):
+                full_path = asset.gzip_path
+                headers["content-encoding"] = "gzip"
+                headers["etag"] = f'"{asset.digest}-gz"'
+
+        try:
+            stat_result = await anyio.to_thread.run_sync(os.stat, full_path)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404)
+        if not stat.S_ISREG(stat_result.st_mode):
+            raise HTTPException(status_code=404)
+
+        response = FileResponse(
+            full_path,
+            stat_result=stat_result,
+            headers=headers,
+            media_type=guess_type(asset.source)[0] or "text/plain"
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+asset_manifest = AssetManifest(
+    roots={
+        "static": settings.STATIC_DIR,
+        "assets": settings.TEMPLATE_DIR / "assets",
+    },
+    build_dir=settings.ASSET_BUILD_DIR
+)
+
+
+if __name__ == "__main__":
+    asset_manifest.build()
+    print(f"{len(asset_manifest.assets)} assets -> {settings.ASSET_BUILD_DIR / MANIFEST_NAME}")
@@ -1,7 +1,8 @@
 import os
 from pathlib import Path
-from pydantic import BaseSettings, PostgresDsn, validator, AnyUrl
-from typing import Optional, Dict, Any, List
+from pydantic import AnyUrl, Field, PostgresDsn, ValidationInfo, field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Optional, Any, Dict, List
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -9,14 +10,28 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 
 class Settings(BaseSettings):
 
+    model_config = SettingsConfigDict(
+        case_sensitive=True,
+        env_file=os.path.join(BASE_DIR, ".env"),
+        env_file_encoding="utf-8",
+        extra="ignore"
+    )
+
     PROJECT_NAME: str = "Pass" # I will change that later
     PROJECT_VERSION: str = "1.0.0"
+    DESCRIPTION: str = ""
     API_V1_STR: str = "/api/v1"
     SERVER_NAME: str = "server" # I will change that later
     SERVER_HOST: AnyUrl = "http://localhost:8000"
+    SERVER_BIND_HOST: str = "127.0.0.1"
+    SERVER_PORT: int = 8000
+    PAGE_URL_TEMPLATE: str = "/pages/{slug}"  # публичный адрес страницы в sitemap и ленте
+    WEB_CONCURRENCY: Optional[int] = None  # по умолчанию число доступных ядер
+    GRACEFUL_TIMEOUT: int = 30  # секунд на завершение начатых запросов
     
     
     SECRET_KEY: str = "your-secret-key-here"  # I will change that in production
+    JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 дней
     BACKEND_CORS_ORIGINS: List[str] = ["*"]  # I will change that in production
     
@@ -26,20 +41,23 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = "postgres"
     POSTGRES_DB: str = "visite_db"
     POSTGRES_PORT: str = "5432"
-    SQLALCHEMY_DATABASE_URI: Optional[PostgresDsn] = None
+    SQLALCHEMY_DATABASE_URI: Optional[PostgresDsn] = Field(None, validate_default=True)
+    DB_CREATE_TABLES: bool = True
     
 
-    @validator("SQLALCHEMY_DATABASE_URI", pre=True)
-    def assemble_db_connection(cls, v: Optional[str], values: Dict[str, Any]) -> Any:
+    @field_validator("SQLALCHEMY_DATABASE_URI", mode="before")
+    @classmethod
+    def assemble_db_connection(cls, v: Optional[str], info: ValidationInfo) -> Any:
         if isinstance(v, str):
             return v
+        values = info.data
         return PostgresDsn.build(
             scheme="postgresql+asyncpg",
-            user=values.get("POSTGRES_USER"),
+            username=values.get("POSTGRES_USER"),
             password=values.get("POSTGRES_PASSWORD"),
             host=values.get("POSTGRES_SERVER"),
-            port=values.get("POSTGRES_PORT"),
-            path=f"/{values.get('POSTGRES_DB') or ''}",
+            port=int(values.get("POSTGRES_PORT")),
+            path=values.get("POSTGRES_DB") or "",
         )
     
     
@@ -50,29 +68,54 @@ class Settings(BaseSettings):
     EMAILS_FROM_EMAIL: Optional[str] = "pass"
     EMAILS_FROM_NAME: Optional[str] = "Pass" # I will change that later
     
+    STATIC_DIR: Path = BASE_DIR / "static"
+    TEMPLATE_DIR: Path = BASE_DIR / "templates"
+    ASSET_BUILD_DIR: Path = BASE_DIR.parent / "build" / "assets"
+    TEMPLATE_BUILD_DIR: Path = BASE_DIR.parent / "build" / "templates"
+    ASSET_MAX_AGE: int = 60 * 60 * 24 * 365  # 1 год
+    
     LOG_LEVEL: str = "INFO"  # DEBUG, INFO, WARNING, ERROR, CRITICAL
     LOG_FORMAT: str = "%(levelprefix)s | %(asctime)s | %(message)s"
     
-    DEBUG: bool = True
+    DEBUG: bool = False
+    RELOAD: bool = False
     TESTING: bool = False
-    
-    class Config:
-        case_sensitive = True
-        env_file = os.path.join(BASE_DIR, ".env")
-        env_file_encoding = "utf-8"
+    METRICS_ENABLED: bool = True
+    # Bearer-токен для /metrics; без него эндпоинт нельзя публиковать наружу
+    METRICS_TOKEN: Optional[str] = None
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_DIR: Path = BASE_DIR.parent / "build" / "profiles"
+    PROFILING_MAX_FILES: int = 100
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    SINGLE_FLIGHT_TIMEOUT: float = 10.0
+    SLOW_QUERY_MS: float = 200.0
+    N_PLUS_ONE_THRESHOLD: int = 5
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_IN_FLIGHT: int = 256
+    ADMISSION_CLASS_LIMITS: Dict[str, int] = {"auth": 16, "writes": 64, "reads": 192}
+    ADMISSION_QUEUE_SIZE: int = 256
+    ADMISSION_QUEUE_TIMEOUT: float = 0.5  # секунд ожидания в очереди до 503
+    # auto — local, если app.core.server запустил больше одного воркера;
+    # postgres — для нескольких хостов; none — только при одном воркере
+    INVALIDATION_TRANSPORT: str = "auto"
+    INVALIDATION_DIR: Path = BASE_DIR.parent / "build" / "invalidation"
+    INVALIDATION_POLL_INTERVAL: float = 30.0
 
 
 class DevelopmentSettings(Settings):
     
     DEBUG: bool = True
-    BACKEND_CORS_ORIGINS = ["http://localhost:3000", "http://127.0.0.1:3000"]
+    BACKEND_CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://127.0.0.1:3000"]
 
 
 class ProductionSettings(Settings):
 
     DEBUG: bool = False
+    SERVER_BIND_HOST: str = "0.0.0.0"
     SECRET_KEY: str = os.getenv("SECRET_KEY", "")
-    BACKEND_CORS_ORIGINS = [
+    BACKEND_CORS_ORIGINS: List[str] = [
         "https://your-production-domain.com",
         "https://www.your-production-domain.com"
     ]
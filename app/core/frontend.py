@@ -0,0 +1,259 @@
+import posixpath
+import re
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.core.assets import AssetManifest, asset_manifest
+from app.core.config import settings
+
+
+CSS_BUNDLES: Dict[str, List[str]] = {
+    "assets/css/site.css": ["assets/css/index.css"],
+    "static/css/site.css": ["static/css/index.css"],
+}
+
+PAGES: Dict[str, str] = {
+    "index.html": "assets/css/site.css",
+}
+
+HERO_IMAGES: Dict[str, str] = {
+    "index.html": "assets/img/home/header-background.png",
+}
+
+EAGER_IMAGES = 1
+ALWAYS_CRITICAL = {"*", ":root", "html", "body"}
+
+ASSET_URL_RE = re.compile(r"""\{\{\s*asset_url\(\s*['"]([^'"]+)['"]\s*\)\s*\}\}""")
+IMG_TAG_RE = re.compile(r"<img\b[^>]*>", re.IGNORECASE)
+CSS_URL_RE = re.compile(r"""url\(\s*['"]?([^'")]+)['"]?\s*\)""")
+
+
+def minify_css(css: str) -> str:
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    css = css.replace(";}", "}")
+    return css.strip()
+
+
+def split_rules(css: str) -> List[Tuple[str, str]]:
+    """Разбивает минифицированный CSS на пары (прелюдия, тело) верхнего уровня"""
+    rules = []
+    pos = 0
+    while pos < len(css):
+        start = css.find("{", pos)
+        if start == -1:
+            break
+        depth = 1
+        end = start + 1
+        while end < len(css) and depth:
+            if css[end] == "{":
+                depth += 1
+            elif css[end] == "}":
+                depth -= 1
+            end += 1
+        rules.append((css[pos:start].strip(), css[start + 1:end - 1]))
+        pos = end
+    return rules
+
+
+def selector_tokens(selector: str) -> Set[str]:
+    compound = re.split(r"[\s>+~]+", selector.strip())[-1]
+    compound = re.sub(r"::?[\w-]+(\([^)]*\))?", "", compound)
+    return set(re.findall(r"[.#]?[\w-]+|\*", compound))
+
+
+def markup_tokens(html: str) -> Set[str]:
+    tokens = set(re.findall(r"<([a-zA-Z][\w-]*)", html))
+    for classes in re.findall(r'class="([^"]*)"', html):
+        tokens.update("." + name for name in classes.split())
+    tokens.update("#" + name for name in re.findall(r'id="([^"]*)"', html))
+    return {token.lower() if token[0] not in ".#" else token for token in tokens}
+
+
+def critical_css(css: str, tokens: Set[str]) -> str:
+    critical = []
+    for prelude, body in split_rules(css):
+        if prelude.startswith("@media") or prelude.startswith("@supports"):
+            inner = critical_css(body, tokens)
+            if inner:
+                critical.append(f"{prelude}{{{inner}}}")
+        elif prelude.startswith("@font-face"):
+            critical.append(f"{prelude}{{{body}}}")
+        elif prelude.startswith("@"):
+            continue
+        else:
+            for selector in prelude.split(","):
+                if selector in ALWAYS_CRITICAL or selector_tokens(selector) <= tokens | {"*"}:
+                    critical.append(f"{prelude}{{{body}}}")
+                    break
+    return "".join(critical)
+
+
+def image_size(path: Path) -> Optional[Tuple[int, int]]:
+    with open(path, "rb") as f:
+        head = f.read(26)
+        if head.startswith(b"\x89PNG\r\n\x1a\n"):
+            return struct.unpack(">II", head[16:24])
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", head[6:10])
+        if not head.startswith(b"\xff\xd8"):
+            return None
+
+        f.seek(2)
+        while True:
+            marker = f.read(2)
+            if len(marker) < 2 or marker[0] != 0xFF:
+                return None
+            if marker[1] in (0xD8, 0x01) or 0xD0 <= marker[1] <= 0xD7:
+                continue
+            length = struct.unpack(">H", f.read(2))[0]
+            if marker[1] in (0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF):
+                height, width = struct.unpack(">xHH", f.read(5))
+                return width, height
+            f.seek(length - 2, 1)
+
+
+class FrontendBuilder:
+
+    def __init__(self, manifest: AssetManifest, template_dir: Path, build_dir: Path):
+        self.manifest = manifest
+        self.template_dir = template_dir
+        self.build_dir = build_dir
+        self.bundles: Dict[str, str] = {}
+
+
+    def build(self) -> "FrontendBuilder":
+        for bundle_path, sources in CSS_BUNDLES.items():
+            self.bundles[bundle_path] = self._bundle_css(bundle_path, sources)
+        for page, bundle_path in PAGES.items():
+            self._build_page(page, bundle_path)
+        return self
+
+
+    def _bundle_css(self, bundle_path: str, sources: List[str]) -> str:
+        parts = []
+        for logical_path in sources:
+            asset = self.manifest.assets.get(logical_path)
+            if asset is None:
+                continue
+            css = Path(asset.source).read_text(encoding="utf-8")
+            parts.append(self._rewrite_css_urls(minify_css(css), logical_path))
+
+        css = "\n".join(parts)
+        target = self.manifest.build_dir / bundle_path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(css, encoding="utf-8")
+        self.manifest.add(bundle_path, target)
+        return css
+
+
+    def _rewrite_css_urls(self, css: str, logical_path: str) -> str:
+        base = logical_path.rsplit("/", 1)[0]
+
+        def replace(match: re.Match) -> str:
+            url = match.group(1)
+            if url.startswith(("data:", "http:", "https:", "//", "#")):
+                return match.group(0)
+            if not url.startswith("/"):
+                url = posixpath.normpath(posixpath.join(base, url))
+            return f"url({self.manifest.url_for(url)})"
+
+        return CSS_URL_RE.sub(replace, css)
+
+
+    def _build_page(self, page: str, bundle_path: str) -> None:
+        html = (self.template_dir / page).read_text(encoding="utf-8")
+        above_fold = html.split("<main", 1)[0]
+        critical = critical_css(self.bundles.get(bundle_path, ""), markup_tokens(above_fold))
+
+        # Результат — шаблон Jinja: {{, {% и {# внутри CSS не должны им разбираться
+        if "endraw" in critical:
+            raise ValueError(f"Critical CSS for {page} cannot be inlined verbatim")
+        head = [f"<style>{{% raw %}}{critical}{{% endraw %}}</style>"]
+        hero = HERO_IMAGES.get(page)
+        if hero:
+            head.append(
+                f'<link rel="preload" as="image" href="{{{{ asset_url(\'{hero}\') }}}}" fetchpriority="high">'
+            )
+        head.append(
+            f'<link rel="preload" as="style" href="{{{{ asset_url(\'{bundle_path}\') }}}}" '
+            "onload=\"this.onload=null;this.rel='stylesheet'\">"
+        )
+        head.append(f'<noscript><link rel="stylesheet" href="{{{{ asset_url(\'{bundle_path}\') }}}}"></noscript>')
+
+        html = re.sub(r'\s*<link rel="stylesheet" href="\{\{\s*asset_url\([^)]*\.css[\'"]\)\s*\}\}">', "", html)
+        html = html.replace("</head>", "    " + "\n    ".join(head) + "\n</head>", 1)
+        html = self._rewrite_images(html)
+
+        target = self.build_dir / page
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(html, encoding="utf-8")
+
+
+    def _rewrite_images(self, html: str) -> str:
+        seen = 0
+
+        def replace(match: re.Match) -> str:
+            nonlocal seen
+            tag = match.group(0)
+            seen += 1
+            attrs = []
+            if " loading=" not in tag:
+                attrs.append('loading="eager"' if seen <= EAGER_IMAGES else 'loading="lazy"')
+            if " decoding=" not in tag:
+                attrs.append('decoding="async"')
+
+            src = ASSET_URL_RE.search(tag)
+            asset = self.manifest.assets.get(src.group(1)) if src else None
+            if asset and " width=" not in tag and " height=" not in tag:
+                size = image_size(Path(asset.source))
+                if size:
+                    attrs.append(f'width="{size[0]}" height="{size[1]}"')
+
+            if not attrs:
+                return tag
+            return tag[:-1].rstrip("/ ") + " " + " ".join(attrs) + ">"
+
+        return IMG_TAG_RE.sub(replace, html)
+
+
+def first_paint_cost(html: str, manifest: AssetManifest) -> Tuple[int, int]:
+    """Байты и запросы, которые браузер должен получить до первой отрисовки"""
+    total_bytes = len(html.encode("utf-8"))
+    requests = 1
+    blocking = re.findall(r'<link rel="stylesheet" href="([^"]+)"', html.split("<noscript>")[0])
+    blocking += re.findall(r'<link rel="preload" as="image" href="([^"]+)"', html)
+    for tag in IMG_TAG_RE.findall(html):
+        if 'loading="lazy"' not in tag:
+            blocking += re.findall(r'src="([^"]+)"', tag)
+
+    for url in blocking:
+        requests += 1
+        asset = manifest.by_fingerprint.get(url.lstrip("/")) or manifest.assets.get(url.lstrip("/"))
+        if asset is None:
+            continue
+        total_bytes += Path(asset.gzip_path or asset.source).stat().st_size
+    return total_bytes, requests
+
+
+frontend = FrontendBuilder(
+    manifest=asset_manifest,
+    template_dir=settings.TEMPLATE_DIR,
+    build_dir=settings.TEMPLATE_BUILD_DIR
+)
+
+
+if __name__ == "__main__":
+    from jinja2 import Environment, FileSystemLoader
+
+    asset_manifest.build()
+    frontend.build()
+    for directory in (settings.TEMPLATE_DIR, settings.TEMPLATE_BUILD_DIR):
+        env = Environment(loader=FileSystemLoader(str(directory)))
+        env.globals["asset_url"] = asset_manifest.url_for
+        for page in PAGES:
+            total_bytes, requests = first_paint_cost(env.get_template(page).render(), asset_manifest)
+            print(f"{directory / page}: {total_bytes} bytes, {requests} requests before first paint")
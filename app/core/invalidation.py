@@ -0,0 +1,429 @@
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import socket
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+PG_CHANNEL = "cache_invalidation"
+MAX_MESSAGE_SIZE = 8192
+LISTEN_BACKOFF = (0.5, 30.0)  # секунд до перезапуска слушателя: начальная и предельная
+
+
+class Invalidation(NamedTuple):
+    topic: str
+    key: str
+    version: int
+    origin: str
+
+
+    def encode(self) -> bytes:
+        return json.dumps(self._asdict()).encode()
+
+
+    @classmethod
+    def decode(cls, data: bytes) -> "Invalidation":
+        return cls(**json.loads(data))
+
+
+class Subscription(NamedTuple):
+    on_key: Callable[[str], None]
+    on_flush: Callable[[], None]
+
+
+class InvalidationTransport(ABC):
+    """Общий для воркеров счётчик версий по топикам и доставка сообщений.
+
+    Доставка может терять сообщения: пропуск обнаруживается по версиям.
+    """
+
+    def setup(self) -> None:
+        pass
+
+
+    @abstractmethod
+    def next_version(self, topic: str) -> int:
+        ...
+
+
+    @abstractmethod
+    def versions(self) -> Dict[str, int]:
+        ...
+
+
+    @abstractmethod
+    def publish(self, message: bytes) -> None:
+        ...
+
+
+    @abstractmethod
+    async def listen(self, callback: Callable[[bytes], None]) -> None:
+        ...
+
+
+class LocalTransport(InvalidationTransport):
+    """Для одного хоста и тестов: версии в файле под flock, доставка —
+    датаграммы по Unix-сокетам воркеров в общем каталоге.
+    """
+
+    def __init__(self, directory: Path, name: Optional[str] = None):
+        self.directory = directory
+        self.name = name
+        self.versions_file = directory / "versions.json"
+        self.lock_file = directory / "versions.lock"
+
+
+    @property
+    def socket_path(self) -> Path:
+        # Модуль импортируется до fork, поэтому pid берётся в момент вызова;
+        # name нужен, когда в одном процессе несколько шин (тесты)
+        return self.directory / f"worker-{self.name or os.getpid()}.sock"
+
+
+    def next_version(self, topic: str) -> int:
+        with self._locked(fcntl.LOCK_EX):
+            versions = self._read_versions()
+            versions[topic] = versions.get(topic, 0) + 1
+            tmp = self.versions_file.with_suffix(".tmp")
+            tmp.write_text(json.dumps(versions))
+            tmp.replace(self.versions_file)
+            return versions[topic]
+
+
+    def versions(self) -> Dict[str, int]:
+        with self._locked(fcntl.LOCK_SH):
+            return self._read_versions()
+
+
+    def publish(self, message: bytes) -> None:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sender:
+            sender.setblocking(False)
+            own = self.socket_path
+            for peer in self.directory.glob("worker-*.sock"):
+                if peer == own:
+                    continue
+                try:
+                    sender.sendto(message, str(peer))
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # Воркер завершился, не убрав сокет
+                    peer.unlink(missing_ok=True)
+                except BlockingIOError:
+                    # Очередь получателя полна — он догонит по версиям
+                    pass
+
+
+    async def listen(self, callback: Callable[[bytes], None]) -> None:
+        path = self.socket_path
+        path.unlink(missing_ok=True)
+        receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        receiver.bind(str(path))
+        receiver.setblocking(False)
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                callback(await loop.sock_recv(receiver, MAX_MESSAGE_SIZE))
+        finally:
+            receiver.close()
+            path.unlink(missing_ok=True)
+
+
+    @contextmanager
+    def _locked(self, operation: int) -> Iterator[None]:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_file, "a") as lock:
+            fcntl.flock(lock, operation)
+            yield
+
+
+    def _read_versions(self) -> Dict[str, int]:
+        try:
+            return json.loads(self.versions_file.read_text())
+        except FileNotFoundError:
+            return {}
+
+
+class PostgresTransport(InvalidationTransport):
+    """Версии в таблице cache_versions, доставка через LISTEN/NOTIFY.
+
+    Для LISTEN нужно отдельное постоянное соединение, его держит asyncpg
+    (тот же драйвер, что в схеме SQLALCHEMY_DATABASE_URI по умолчанию).
+    """
+
+    def __init__(self, engine, dsn: str, channel: str = PG_CHANNEL):
+        try:
+            import asyncpg  # noqa: F401
+        except ImportError:
+            raise RuntimeError("INVALIDATION_TRANSPORT=postgres requires the asyncpg package") from None
+        from sqlalchemy.engine import make_url
+
+        self.engine = engine
+        # asyncpg принимает только libpq-DSN, без суффикса драйвера SQLAlchemy
+        self.dsn = make_url(dsn).set(drivername="postgresql").render_as_string(hide_password=False)
+        self.channel = channel
+
+
+    def setup(self) -> None:
+        from sqlalchemy import text
+
+        with self.engine.begin() as connection:
+            connection.execute(text(
+                "CREATE TABLE IF NOT EXISTS cache_versions ("
+                "topic varchar(100) PRIMARY KEY, version bigint NOT NULL)"
+            ))
+
+
+    def next_version(self, topic: str) -> int:
+        from sqlalchemy import text
+
+        with self.engine.begin() as connection:
+            return connection.execute(
+                text(
+                    "INSERT INTO cache_versions (topic, version) VALUES (:topic, 1) "
+                    "ON CONFLICT (topic) DO UPDATE SET version = cache_versions.version + 1 "
+                    "RETURNING version"
+                ),
+                {"topic": topic}
+            ).scalar_one()
+
+
+    def versions(self) -> Dict[str, int]:
+        from sqlalchemy import text
+
+        with self.engine.connect() as connection:
+            return dict(connection.execute(text("SELECT topic, version FROM cache_versions")).all())
+
+
+    def publish(self, message: bytes) -> None:
+        from sqlalchemy import text
+
+        with self.engine.begin() as connection:
+            connection.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": self.channel, "payload": message.decode()}
+            )
+
+
+    async def listen(self, callback: Callable[[bytes], None]) -> None:
+        import asyncpg
+
+        connection = await asyncpg.connect(self.dsn)
+        closed = asyncio.get_running_loop().create_future()
+        connection.add_termination_listener(lambda conn: closed.done() or closed.set_result(None))
+        try:
+            await connection.add_listener(
+                self.channel, lambda conn, pid, channel, payload: callback(payload.encode())
+            )
+            await closed
+            raise ConnectionError("LISTEN connection closed")
+        finally:
+            await connection.close()
+
+
+class InvalidationBus:
+    """Версионированные события инвалидации кэшей между воркерами.
+
+    Каждое событие несёт версию своего топика из общего счётчика. Воркер
+    помнит последнюю применённую версию: следующая по порядку инвалидирует
+    один ключ, скачок означает пропущенные сообщения и сбрасывает топик
+    целиком. Периодическая сверка с общим счётчиком ловит потерю последних
+    сообщений: устаревшие данные живут не дольше poll_interval.
+
+    Публикация идёт в одном фоновом потоке и не задерживает запрос, а
+    упавший слушатель перезапускается с нарастающей паузой.
+    """
+
+    def __init__(self, transport: InvalidationTransport, poll_interval: float = 30.0):
+        self.transport = transport
+        self.poll_interval = poll_interval
+        self.subscriptions: Dict[str, List[Subscription]] = {}
+        self.seen: Dict[str, int] = {}
+        # Не pid: при PostgresTransport воркеры разных хостов могут совпасть по pid
+        self.origin = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        # Один поток сохраняет порядок публикаций этого воркера
+        self._publisher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="invalidation")
+
+
+    def subscribe(
+        self,
+        topic: str,
+        on_key: Callable[[str], None],
+        on_flush: Callable[[], None]
+    ) -> None:
+        self.subscriptions.setdefault(topic, []).append(Subscription(on_key, on_flush))
+
+
+    def invalidate(self, topic: str, key: object) -> None:
+        self._publisher.submit(self._publish, topic, str(key))
+
+
+    def close(self) -> None:
+        self._publisher.shutdown(wait=True)
+
+
+    async def run(self) -> None:
+        from anyio import to_thread
+
+        try:
+            await to_thread.run_sync(self.transport.setup)
+            versions = await to_thread.run_sync(self.transport.versions)
+            with self._lock:
+                self.seen = versions
+        except Exception:
+            # Без начальных версий первая сверка сбросит кэши один раз
+            logger.exception("Failed to initialise invalidation transport")
+
+        listener = asyncio.ensure_future(self._listen())
+        try:
+            while True:
+                await asyncio.sleep(self.poll_interval)
+                try:
+                    await self.poll()
+                except Exception:
+                    logger.exception("Invalidation version poll failed")
+        finally:
+            listener.cancel()
+            await asyncio.gather(listener, return_exceptions=True)
+
+
+    async def poll(self) -> None:
+        from anyio import to_thread
+
+        versions = await to_thread.run_sync(self.transport.versions)
+        for topic, version in versions.items():
+            with self._lock:
+                stale = version > self.seen.get(topic, 0)
+                if stale:
+                    self.seen[topic] = version
+            if stale:
+                self._flush(topic)
+
+
+    async def _listen(self) -> None:
+        loop = asyncio.get_running_loop()
+        initial, limit = LISTEN_BACKOFF
+        delay = initial
+        while True:
+            started = loop.time()
+            try:
+                await self.transport.listen(self._receive)
+            except Exception:
+                logger.exception("Invalidation listener failed, restarting in %.1f s", delay)
+            if loop.time() - started > limit:
+                delay = initial
+            # Пропущенное за это время догонится по скачку версий или сверкой
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, limit)
+
+
+    def _publish(self, topic: str, key: str) -> None:
+        # Вызывающий уже обновил свой кэш, поэтому локально применяется только
+        # пропуск версий; остальным воркерам событие уходит через транспорт
+        try:
+            event = Invalidation(topic, key, self.transport.next_version(topic), self.origin)
+            self._apply(event, local=True)
+            self.transport.publish(event.encode())
+        except Exception:
+            logger.exception("Failed to publish invalidation for %s:%s", topic, key)
+
+
+    def _receive(self, data: bytes) -> None:
+        try:
+            event = Invalidation.decode(data)
+        except (ValueError, TypeError):
+            logger.warning("Malformed invalidation message: %r", data[:200])
+            return
+        if event.origin == self.origin:
+            return
+        try:
+            self._apply(event)
+        except Exception:
+            # Исключение здесь остановило бы слушатель транспорта
+            logger.exception("Failed to apply invalidation %r", event)
+
+
+    def _apply(self, event: Invalidation, local: bool = False) -> None:
+        with self._lock:
+            seen = self.seen.get(event.topic, 0)
+            if event.version <= seen:
+                return
+            self.seen[event.topic] = event.version
+        if event.version > seen + 1:
+            self._flush(event.topic)
+        elif not local:
+            for subscription in self.subscriptions.get(event.topic, ()):
+                self._call(subscription.on_key, event.key)
+
+
+    def _flush(self, topic: str) -> None:
+        for subscription in self.subscriptions.get(topic, ()):
+            self._call(subscription.on_flush)
+
+
+    @staticmethod
+    def _call(handler: Callable, *args) -> None:
+        # Ошибка одного подписчика не должна останавливать доставку остальным
+        try:
+            handler(*args)
+        except Exception:
+            logger.exception("Invalidation handler %r failed", handler)
+
+
+# Сколько воркеров запустил app.core.server; выставляется в мастере до fork
+worker_count = 1
+
+
+def transport_name() -> str:
+    name = settings.INVALIDATION_TRANSPORT
+    if name == "auto":
+        # Без шины правка страницы обновит sitemap только в своём воркере
+        return "local" if worker_count > 1 else "none"
+    return name
+
+
+def create_bus() -> Optional[InvalidationBus]:
+    name = transport_name()
+    if name == "postgres":
+        from app.db.session import engine
+
+        transport = PostgresTransport(engine, str(settings.SQLALCHEMY_DATABASE_URI))
+    elif name == "local":
+        transport = LocalTransport(settings.INVALIDATION_DIR)
+    else:
+        return None
+    return InvalidationBus(transport, poll_interval=settings.INVALIDATION_POLL_INTERVAL)
+
+
+# Создаётся в lifespan воркера (start_bus); до этого и без транспорта
+# (none или auto с одним воркером) публикация ничего не делает
+invalidation_bus: Optional[InvalidationBus] = None
+
+
+def start_bus() -> Optional[InvalidationBus]:
+    global invalidation_bus
+    invalidation_bus = create_bus()
+    return invalidation_bus
+
+
+def stop_bus() -> None:
+    global invalidation_bus
+    if invalidation_bus is not None:
+        invalidation_bus.close()
+        invalidation_bus = None
+
+
+def invalidate(topic: str, key: object) -> None:
+    if invalidation_bus is not None:
+        invalidation_bus.invalidate(topic, key)
@@ -0,0 +1,163 @@
+import hmac
+import os
+import time
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+from fastapi import HTTPException, Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+UNMATCHED_ROUTE = "<unmatched>"
+# Метод приходит от клиента как есть: прочие токены сводятся к одной метке
+KNOWN_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+OTHER_METHOD = "OTHER"
+
+
+class RouteStats:
+    __slots__ = ("buckets", "total", "count", "response_bytes", "statuses")
+
+    def __init__(self):
+        self.buckets: List[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.response_bytes = 0
+        self.statuses: Dict[int, int] = {}
+
+
+class MetricsRegistry:
+    """Метрики одного воркера.
+
+    Обновляются только из event loop, поэтому обходятся без блокировок;
+    значения отдаются с меткой worker (pid процесса).
+    """
+
+    def __init__(self):
+        self.routes: Dict[Tuple[str, str], RouteStats] = {}
+        self.in_flight = 0
+
+
+    def observe(self, route: str, method: str, status: int, duration: float, size: int) -> None:
+        stats = self.routes.get((route, method))
+        if stats is None:
+            stats = self.routes[(route, method)] = RouteStats()
+        stats.buckets[bisect_left(LATENCY_BUCKETS, duration)] += 1
+        stats.total += duration
+        stats.count += 1
+        stats.response_bytes += size
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+
+    def render(self) -> str:
+        worker = str(os.getpid())
+        lines = [
+            "# HELP http_requests_in_flight Requests currently being served.",
+            "# TYPE http_requests_in_flight gauge",
+            f'http_requests_in_flight{{worker="{worker}"}} {self.in_flight}',
+            "# HELP http_request_duration_seconds Request latency by route.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        routes = sorted(self.routes.items())
+        for (route, method), stats in routes:
+            labels = f'route="{_escape(route)}",method="{method}",worker="{worker}"'
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.count}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {stats.total}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {stats.count}")
+
+        lines += [
+            "# HELP http_requests_total Requests by route and status code.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (route, method), stats in routes:
+            labels = f'route="{_escape(route)}",method="{method}",worker="{worker}"'
+            for status, count in sorted(stats.statuses.items()):
+                lines.append(f'http_requests_total{{{labels},status="{status}"}} {count}')
+
+        lines += [
+            "# HELP http_response_size_bytes Response body size by route.",
+            "# TYPE http_response_size_bytes summary",
+        ]
+        for (route, method), stats in routes:
+            labels = f'route="{_escape(route)}",method="{method}",worker="{worker}"'
+            lines.append(f"http_response_size_bytes_sum{{{labels}}} {stats.response_bytes}")
+            lines.append(f"http_response_size_bytes_count{{{labels}}} {stats.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def route_label(scope: Scope) -> str:
+    # Шаблон пути, а не сам путь: иначе число меток растёт без ограничений
+    route = scope.get("route")
+    if route is not None and hasattr(route, "path"):
+        return route.path
+    if "endpoint" in scope:
+        return scope.get("root_path", "") + "/{path}"
+    return UNMATCHED_ROUTE
+
+
+def method_label(scope: Scope) -> str:
+    method = scope["method"]
+    return method if method in KNOWN_METHODS else OTHER_METHOD
+
+
+async def authorize_scrape(request: Request) -> None:
+    # Без METRICS_TOKEN /metrics открыт: тогда его закрывают на прокси
+    if not settings.METRICS_TOKEN:
+        return
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+
+class MetricsMiddleware:
+
+    def __init__(self, app: ASGIApp, registry: "MetricsRegistry" = None):
+        self.app = app
+        self.registry = registry or metrics
+
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registry = self.registry
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        registry.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            registry.in_flight -= 1
+            registry.observe(
+                route_label(scope), method_label(scope), status, time.perf_counter() - start, size
+            )
+
+
+metrics = MetricsRegistry()
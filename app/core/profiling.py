@@ -0,0 +1,175 @@
+import cProfile
+import random
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs
+
+import anyio
+import anyio.to_thread
+from fastapi import HTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.security import get_current_admin_user, get_current_user
+
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY = b"profile"
+PROFILE_NAME_RE = re.compile(r"^[\w.-]+\.pstats$")
+CONCURRENT_SUFFIX = ".concurrent"
+
+
+class ProfileStore:
+    """Кольцевой буфер pstats-файлов на диске"""
+
+    def __init__(self, directory: Path, max_files: int):
+        self.directory = directory
+        self.max_files = max_files
+
+
+    def new_id(self, method: str, path: str) -> str:
+        slug = re.sub(r"[^\w-]+", "_", path.strip("/"))[:60] or "root"
+        return f"{time.time_ns()}-{method}-{slug}.pstats"
+
+
+    def save(self, profiler: cProfile.Profile, profile_id: str, concurrent: bool = False) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(self.directory / profile_id))
+        if concurrent:
+            # Пометка рядом с файлом: имя профиля клиент уже получил в заголовке
+            (self.directory / (profile_id + CONCURRENT_SUFFIX)).touch()
+        self._prune()
+
+
+    def list(self) -> List[Dict[str, object]]:
+        if not self.directory.is_dir():
+            return []
+        profiles = []
+        for file in self.directory.glob("*.pstats"):
+            stat_result = file.stat()
+            profiles.append({
+                "id": file.name,
+                "size": stat_result.st_size,
+                "created_at": stat_result.st_mtime,
+                "concurrent": file.with_name(file.name + CONCURRENT_SUFFIX).exists(),
+            })
+        return sorted(profiles, key=lambda p: p["id"], reverse=True)
+
+
+    def path(self, profile_id: str) -> Optional[Path]:
+        if not PROFILE_NAME_RE.match(profile_id):
+            return None
+        file = self.directory / profile_id
+        return file if file.is_file() else None
+
+
+    def _prune(self) -> None:
+        files = sorted(self.directory.glob("*.pstats"))
+        for file in files[:max(len(files) - self.max_files, 0)]:
+            file.unlink(missing_ok=True)
+            file.with_name(file.name + CONCURRENT_SUFFIX).unlink(missing_ok=True)
+
+
+class ProfilingMiddleware:
+    """Профилирует запрос через cProfile по флагу администратора или выборочно.
+
+    Одновременно активен только один профилировщик на процесс; пока он
+    работает, остальные запросы проходят без профилирования. cProfile
+    записывает всё, что выполняется в потоке event loop, в том числе чужие
+    корутины, поэтому профиль, снятый при других запросах в обработке,
+    помечается как concurrent: он точен только при единственном запросе.
+    """
+
+    def __init__(self, app: ASGIApp, store: ProfileStore = None, sample_rate: float = 0.0):
+        self.app = app
+        self.store = store or profile_store
+        self.sample_rate = sample_rate
+        self._active = False
+        self._in_flight = 0
+        self._concurrent = False
+
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        self._in_flight += 1
+        try:
+            await self._handle(scope, receive, send)
+        finally:
+            self._in_flight -= 1
+
+
+    async def _handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self._active:
+            self._concurrent = True
+            await self.app(scope, receive, send)
+            return
+
+        sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        if not sampled and not (self._requested(scope) and await self._is_admin(scope)):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = self.store.new_id(scope["method"], scope["path"])
+        profiler = cProfile.Profile()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        self._active = True
+        self._concurrent = self._in_flight > 1
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            self._active = False
+            # Отменённый запрос (клиент отключился) всё равно сохраняет профиль
+            with anyio.CancelScope(shield=True):
+                await anyio.to_thread.run_sync(
+                    self.store.save, profiler, profile_id, self._concurrent
+                )
+
+
+    @staticmethod
+    def _requested(scope: Scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                return value not in (b"", b"0", b"false")
+        query = scope.get("query_string", b"")
+        if PROFILE_QUERY not in query:
+            return False
+        values = parse_qs(query.decode("latin-1")).get(PROFILE_QUERY.decode())
+        return bool(values) and values[-1] not in ("", "0", "false")
+
+
+    @staticmethod
+    async def _is_admin(scope: Scope) -> bool:
+        authorization = ""
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                authorization = value.decode("latin-1")
+                break
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return False
+        try:
+            user = await get_current_user(token=token)
+            await get_current_admin_user(current_user=user)
+        except HTTPException:
+            return False
+        return True
+
+
+profile_store = ProfileStore(
+    directory=settings.PROFILING_DIR,
+    max_files=settings.PROFILING_MAX_FILES
+)
@@ -0,0 +1,139 @@
+import math
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from app.core.config import settings
+from app.core.security import decode_token
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    rate: float  # токенов в секунду
+    burst: int
+    key: str = "ip"  # "ip" или "user"
+
+
+# Лимиты на один процесс: с LocalTokenBucketBackend у каждого воркера свои
+# вёдра, и при N воркерах app.core.server клиент фактически получает до
+# N × burst запросов (для contacts — N × 5 в минуту)
+POLICIES: Dict[str, RateLimitPolicy] = {
+    "contacts": RateLimitPolicy(rate=5 / 60, burst=5),
+    "auth": RateLimitPolicy(rate=10 / 60, burst=10),
+}
+
+
+class RateLimitBackend(ABC):
+    """Хранилище состояния лимитов.
+
+    `acquire` возвращает 0, если запрос пропущен, иначе — через сколько секунд
+    появится токен. Общее для воркеров хранилище реализует тот же метод.
+    """
+
+    @abstractmethod
+    async def acquire(self, key: str, policy: RateLimitPolicy) -> float:
+        ...
+
+
+class LocalTokenBucketBackend(RateLimitBackend):
+    """Token bucket в памяти процесса: шарды с собственным lock и LRU-вытеснением.
+
+    Состояние не разделяется между воркерами, см. POLICIES.
+    """
+
+    def __init__(
+        self,
+        shards: int = 16,
+        max_keys: int = 100_000,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.clock = clock
+        self.shard_capacity = max(max_keys // shards, 1)
+        self._shards: List[Tuple[threading.Lock, "OrderedDict[str, Tuple[float, float]]"]] = [
+            (threading.Lock(), OrderedDict()) for _ in range(shards)
+        ]
+
+
+    async def acquire(self, key: str, policy: RateLimitPolicy) -> float:
+        return self.take(key, policy)
+
+
+    def take(self, key: str, policy: RateLimitPolicy) -> float:
+        lock, buckets = self._shards[zlib.crc32(key.encode()) % len(self._shards)]
+        now = self.clock()
+        with lock:
+            tokens, updated = buckets.pop(key, (float(policy.burst), now))
+            tokens = min(policy.burst, tokens + (now - updated) * policy.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / policy.rate
+            # Полное ведро эквивалентно отсутствующему, хранить его незачем
+            if tokens < policy.burst:
+                buckets[key] = (tokens, now)
+                if len(buckets) > self.shard_capacity:
+                    buckets.popitem(last=False)
+        return wait
+
+
+    def __len__(self) -> int:
+        return sum(len(buckets) for _, buckets in self._shards)
+
+
+class RateLimiter:
+
+    def __init__(self, backend: RateLimitBackend, policies: Dict[str, RateLimitPolicy]):
+        self.backend = backend
+        self.policies = policies
+
+
+    def limit(self, name: str) -> Callable:
+        async def dependency(request: Request) -> None:
+            if not settings.RATE_LIMIT_ENABLED:
+                return
+            policy = self.policies[name]
+            wait = await self.backend.acquire(f"{name}:{client_key(request, policy)}", policy)
+            if wait > 0:
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many requests",
+                    headers={"Retry-After": str(math.ceil(wait))}
+                )
+
+        return dependency
+
+
+def client_key(request: Request, policy: RateLimitPolicy) -> str:
+    if policy.key == "user":
+        user = _token_subject(request)
+        if user:
+            return f"user:{user}"
+    host = request.client.host if request.client else "unknown"
+    return f"ip:{host}"
+
+
+def _token_subject(request: Request) -> Optional[str]:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return decode_token(token).get("sub")
+    except HTTPException:
+        return None
+
+
+rate_limiter = RateLimiter(
+    backend=LocalTokenBucketBackend(max_keys=settings.RATE_LIMIT_MAX_KEYS),
+    policies=POLICIES
+)
+
+
+def rate_limit(name: str) -> Callable:
+    return rate_limiter.limit(name)
@@ -41,6 +41,7 @@ class UserBase(BaseModel):
 
 class UserInDB(UserBase):
     hashed_password: str
+    scopes: list[str] = []
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -0,0 +1,56 @@
+from functools import lru_cache
+from typing import Any, FrozenSet, Optional, Type
+
+from pydantic import BaseModel, TypeAdapter, create_model
+from starlette.responses import Response
+
+
+class RawJSONResponse(Response):
+    """Тело уже закодировано в JSON, повторная сериализация не нужна"""
+
+    media_type = "application/json"
+
+
+# Проекции пересоздаются после вытеснения из кэша projection, и каждая новая
+# схема — новый ключ здесь, поэтому и этот кэш ограничен
+ADAPTER_CACHE_SIZE = 1024
+PROJECTION_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=ADAPTER_CACHE_SIZE)
+def type_adapter(schema: Any) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+@lru_cache(maxsize=PROJECTION_CACHE_SIZE)
+def projection(schema: Type[BaseModel], fields: Optional[FrozenSet[str]]) -> Type[BaseModel]:
+    """Схема с подмножеством полей для sparse fieldsets (`?fields=`)"""
+    if fields is None or fields >= schema.model_fields.keys():
+        return schema
+    return create_model(
+        f"{schema.__name__}Projection",
+        **{
+            name: (field.annotation, field)
+            for name, field in schema.model_fields.items()
+            if name in fields
+        }
+    )
+
+
+def validate(schema: Any, data: Any) -> Any:
+    return type_adapter(schema).validate_python(data, from_attributes=True)
+
+
+def json_response(
+    schema: Any,
+    data: Any,
+    *,
+    status_code: int = 200,
+    validated: bool = False
+) -> RawJSONResponse:
+    # FastAPI не трогает response_model, если эндпоинт вернул Response,
+    # поэтому данные проверяются один раз и сразу кодируются pydantic-core
+    adapter = type_adapter(schema)
+    if not validated:
+        data = adapter.validate_python(data, from_attributes=True)
+    return RawJSONResponse(adapter.dump_json(data), status_code=status_code)
@@ -0,0 +1,366 @@
+import argparse
+import importlib.util
+import logging
+import os
+import select
+import signal
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+import uvicorn
+
+from app.core.config import settings
+
+
+logger = logging.getLogger("uvicorn.error")
+
+READY_TIMEOUT = 60
+MAX_BOOT_FAILURES = 5
+# Передаются новому процессу мастера при exec по SIGHUP
+LISTEN_FD_ENV = "SERVER_LISTEN_FD"
+OLD_WORKERS_ENV = "SERVER_OLD_WORKERS"
+
+
+def default_workers() -> int:
+    if settings.WEB_CONCURRENCY:
+        return settings.WEB_CONCURRENCY
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def loop_impl() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def http_impl() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+class WorkerServer(uvicorn.Server):
+    """uvicorn.Server, который сообщает мастеру о готовности через pipe"""
+
+    def __init__(self, config: uvicorn.Config, ready_fd: int):
+        super().__init__(config)
+        self.ready_fd = ready_fd
+
+
+    async def startup(self, sockets: Optional[List[socket.socket]] = None) -> None:
+        await super().startup(sockets=sockets)
+        if self.started:
+            os.write(self.ready_fd, b"1")
+        os.close(self.ready_fd)
+
+
+@dataclass
+class Worker:
+    pid: int
+    ready_fd: int  # -1 у воркеров, унаследованных от прежнего процесса мастера
+    ready: bool = False
+
+
+class Supervisor:
+    """Pre-fork мастер: один слушающий сокет, N форкнутых воркеров uvicorn.
+
+    Воркеры получают приложение, уже загруженное в мастере, поэтому новый
+    код подхватывает только новый процесс мастера. SIGHUP проверяет, что
+    код импортируется, и делает exec мастера с тем же pid: слушающий сокет
+    и список старых воркеров передаются через окружение. Новый мастер
+    заменяет воркеров по одному: новый поднимается и сообщает о готовности,
+    только после этого старый получает SIGTERM и дорабатывает начатые
+    запросы. SIGTERM/SIGINT — мягкая остановка всех воркеров.
+    """
+
+    def __init__(
+        self,
+        config: uvicorn.Config,
+        workers: int,
+        post_fork: Optional[Callable[[], None]] = None
+    ):
+        self.config = config
+        self.workers_count = workers
+        self.post_fork = post_fork
+        self.workers: Dict[int, Worker] = {}
+        self.socket: Optional[socket.socket] = None
+        self._stopping = False
+        self._reload_requested = False
+        self._boot_failures = 0
+
+
+    def run(self) -> None:
+        self.socket = self._inherited_socket() or self.config.bind_socket()
+        signal.signal(signal.SIGHUP, self._on_reload)
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+
+        old_workers = self._inherited_workers()
+        logger.info(
+            "Starting %d workers (loop=%s, http=%s)",
+            self.workers_count, self.config.loop, self.config.http
+        )
+        if old_workers:
+            self.workers.update((worker.pid, worker) for worker in old_workers)
+            self.rolling_restart()
+        for _ in range(self.workers_count - len(self.workers)):
+            self._spawn()
+
+        try:
+            while not self._stopping:
+                if self._reload_requested:
+                    self._reload_requested = False
+                    self.reexec()
+                self._reap()
+                time.sleep(0.2)
+        finally:
+            self.stop_all()
+            self.socket.close()
+
+
+    def reexec(self) -> None:
+        if not self._new_code_imports():
+            return
+        fd = self.socket.fileno()
+        os.set_inheritable(fd, True)
+        env = {
+            **os.environ,
+            LISTEN_FD_ENV: str(fd),
+            OLD_WORKERS_ENV: ",".join(str(pid) for pid in self.workers),
+        }
+        logger.info("Re-executing master to load new code")
+        sys.stdout.flush()
+        sys.stderr.flush()
+        # pipe готовности не наследуются при exec, воркеры остаются нашими детьми
+        os.execve(sys.executable, sys.orig_argv, env)
+
+
+    def rolling_restart(self) -> None:
+        old_workers = list(self.workers.values())
+        logger.info("Rolling restart of %d workers", len(old_workers))
+        for index, old in enumerate(old_workers):
+            if self._stopping:
+                return
+            if index < self.workers_count:
+                new = self._spawn()
+                if not self._wait_ready(new):
+                    logger.error("Worker %d failed to start, keeping old workers", new.pid)
+                    self._stop_worker(new)
+                    return
+            self._stop_worker(old)
+
+
+    @staticmethod
+    def _new_code_imports() -> bool:
+        # Иначе exec мастера со сломанным кодом оставил бы воркеров без мастера
+        spec = getattr(sys.modules["__main__"], "__spec__", None)
+        if spec is None:
+            return True
+        try:
+            result = subprocess.run(
+                [sys.executable, "-c", f"import {spec.name}"],
+                capture_output=True,
+                text=True,
+                timeout=READY_TIMEOUT
+            )
+        except subprocess.TimeoutExpired:
+            logger.error("Importing new code timed out, keeping current workers")
+            return False
+        if result.returncode != 0:
+            logger.error("New code failed to import, keeping current workers:\n%s", result.stderr[-2000:])
+            return False
+        return True
+
+
+    @staticmethod
+    def _inherited_socket() -> Optional[socket.socket]:
+        fd = os.environ.pop(LISTEN_FD_ENV, None)
+        if fd is None:
+            return None
+        sock = socket.socket(fileno=int(fd))
+        sock.set_inheritable(False)
+        return sock
+
+
+    @staticmethod
+    def _inherited_workers() -> List[Worker]:
+        pids = os.environ.pop(OLD_WORKERS_ENV, "")
+        return [Worker(pid=int(pid), ready_fd=-1, ready=True) for pid in pids.split(",") if pid]
+
+
+    def stop_all(self) -> None:
+        for worker in self.workers.values():
+            self._signal(worker.pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.config.timeout_graceful_shutdown + 5
+        while self.workers and time.monotonic() < deadline:
+            self._reap(respawn=False)
+            time.sleep(0.1)
+        for pid in list(self.workers):
+            logger.warning("Worker %d did not stop in time, killing", pid)
+            self._signal(pid, signal.SIGKILL)
+            self._forget(pid)
+
+
+    def _spawn(self) -> Worker:
+        ready_r, ready_w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_r)
+            for worker in self.workers.values():
+                if worker.ready_fd >= 0:
+                    os.close(worker.ready_fd)
+            self._run_worker(ready_w)
+        os.close(ready_w)
+        worker = Worker(pid=pid, ready_fd=ready_r)
+        self.workers[pid] = worker
+        return worker
+
+
+    def _run_worker(self, ready_fd: int) -> None:
+        # Дочерний процесс: обработчики мастера не наследуются, SIGHUP адресован только мастеру
+        status = 0
+        try:
+            signal.signal(signal.SIGHUP, signal.SIG_IGN)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            if self.post_fork:
+                self.post_fork()
+            WorkerServer(self.config, ready_fd).run(sockets=[self.socket])
+        except SystemExit as e:
+            status = e.code if isinstance(e.code, int) else 1
+        except BaseException:
+            logger.exception("Worker %d crashed", os.getpid())
+            status = 1
+        finally:
+            os._exit(status)
+
+
+    def _wait_ready(self, worker: Worker, timeout: float = READY_TIMEOUT) -> bool:
+        if worker.ready:
+            return True
+        readable, _, _ = select.select([worker.ready_fd], [], [], timeout)
+        worker.ready = bool(readable) and os.read(worker.ready_fd, 1) == b"1"
+        return worker.ready
+
+
+    def _stop_worker(self, worker: Worker) -> None:
+        self._signal(worker.pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.config.timeout_graceful_shutdown + 5
+        while time.monotonic() < deadline:
+            try:
+                pid, _ = os.waitpid(worker.pid, os.WNOHANG)
+            except ChildProcessError:
+                pid = worker.pid
+            if pid:
+                self._forget(worker.pid)
+                return
+            time.sleep(0.1)
+        logger.warning("Worker %d did not drain in time, killing", worker.pid)
+        self._signal(worker.pid, signal.SIGKILL)
+        os.waitpid(worker.pid, 0)
+        self._forget(worker.pid)
+
+
+    def _reap(self, respawn: bool = True) -> None:
+        for worker in list(self.workers.values()):
+            if not worker.ready:
+                readable, _, _ = select.select([worker.ready_fd], [], [], 0)
+                if readable:
+                    worker.ready = os.read(worker.ready_fd, 1) == b"1"
+                    if worker.ready:
+                        self._boot_failures = 0
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if not pid:
+                return
+            worker = self.workers.get(pid)
+            if worker is None:
+                continue
+            self._forget(pid)
+            if not respawn or self._stopping:
+                continue
+            logger.warning("Worker %d exited with status %d, respawning", pid, os.waitstatus_to_exitcode(status))
+            if not worker.ready:
+                self._boot_failures += 1
+                if self._boot_failures >= MAX_BOOT_FAILURES:
+                    logger.error("Workers keep failing at startup, shutting down")
+                    self._stopping = True
+                    return
+            self._spawn()
+
+
+    def _forget(self, pid: int) -> None:
+        worker = self.workers.pop(pid, None)
+        if worker is not None and worker.ready_fd >= 0:
+            os.close(worker.ready_fd)
+
+
+    @staticmethod
+    def _signal(pid: int, sig: int) -> None:
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
+
+
+    def _on_reload(self, signum, frame) -> None:
+        self._reload_requested = True
+
+
+    def _on_stop(self, signum, frame) -> None:
+        self._stopping = True
+
+
+def serve(
+    app,
+    *,
+    host: str,
+    port: int,
+    workers: int,
+    preload: Optional[Callable[[], None]] = None,
+    post_fork: Optional[Callable[[], None]] = None
+) -> None:
+    config = uvicorn.Config(
+        app,
+        host=host,
+        port=port,
+        loop=loop_impl(),
+        http=http_impl(),
+        log_level=settings.LOG_LEVEL.lower(),
+        timeout_graceful_shutdown=settings.GRACEFUL_TIMEOUT
+    )
+    if preload:
+        preload()
+    if not hasattr(os, "fork"):
+        uvicorn.Server(config).run()
+        return
+    from app.core import invalidation
+
+    # Воркеры наследуют значение при fork и включают шину инвалидации
+    invalidation.worker_count = workers
+    Supervisor(config, workers=workers, post_fork=post_fork).run()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=f"{settings.PROJECT_NAME} server")
+    parser.add_argument("--host", default=settings.SERVER_BIND_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--reload", action="store_true", default=settings.RELOAD)
+    return parser.parse_args(argv)
+
+
+def run_reload(app_path: str, host: str, port: int) -> None:
+    uvicorn.run(
+        app_path,
+        host=host,
+        port=port,
+        reload=True,
+        log_level=settings.LOG_LEVEL.lower()
+    )
@@ -0,0 +1,72 @@
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+from fastapi import HTTPException, status
+
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Одновременные вызовы с одинаковым ключом ждут один общий запуск.
+
+    Ведущий вызов выполняется отдельной задачей, поэтому отмена любого из
+    ожидающих (например, клиент закрыл соединение) не отменяет остальных.
+    Результат и исключение получают все ожидающие; после завершения ключ
+    освобождается, и следующий вызов запускается заново.
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+            future.add_done_callback(functools.partial(self._done, key))
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail="Timed out waiting for the result"
+            )
+
+
+    def _done(self, key: Hashable, future: asyncio.Future) -> None:
+        self._calls.pop(key, None)
+        # Если все ожидающие ушли по таймауту, исключение всё равно считается полученным
+        if not future.cancelled():
+            future.exception()
+
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+def _method_key(args: tuple, kwargs: Dict[str, Any]) -> Hashable:
+    # Первый аргумент — self: сервис создаётся на каждый запрос и в ключ не входит
+    return args[1:], tuple(sorted(kwargs.items()))
+
+
+def coalesce(
+    timeout: Optional[float] = None,
+    key: Callable[[tuple, Dict[str, Any]], Hashable] = _method_key
+) -> Callable:
+    """Декоратор для async-методов сервисов: см. SingleFlight"""
+
+    def decorator(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        group = SingleFlight(timeout=timeout)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs) -> T:
+            return await group.do(key(args, kwargs), lambda: fn(*args, **kwargs))
+
+        wrapper.single_flight = group
+        return wrapper
+
+    return decorator
@@ -0,0 +1,151 @@
+import logging
+import time
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = str(Path(__file__).resolve().parent.parent)
+THIS_FILE = str(Path(__file__).resolve())
+MAX_LOGGED_PARAMS = 500
+
+_current: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+
+
+class QueryStats:
+    """Запросы к БД в рамках одного HTTP-запроса или блока capture_queries()"""
+
+    __slots__ = ("count", "duration", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter = Counter()
+
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+
+
+    def repeated(self, threshold: int = None) -> List[Tuple[str, int]]:
+        """Одинаковые запросы, выполненные не меньше threshold раз — признак N+1"""
+        threshold = threshold or settings.N_PLUS_ONE_THRESHOLD
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+def _origin() -> str:
+    # Первый кадр из кода приложения, если идти от места выполнения запроса вверх
+    for frame in reversed(traceback.extract_stack()):
+        if frame.filename.startswith(APP_DIR) and frame.filename != THIS_FILE:
+            return f"{frame.filename[len(APP_DIR) + 1:]}:{frame.lineno} in {frame.name}"
+    return "<unknown>"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Время старта живёт в контексте выполнения: у упавшего запроса нет
+    # after_cursor_execute, и стек на соединении рос бы с каждой ошибкой
+    context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - context._query_start
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, duration)
+    if duration * 1000 >= settings.SLOW_QUERY_MS:
+        logger.warning(
+            "Slow query (%.1f ms) at %s: %s; parameters: %.*s",
+            duration * 1000, _origin(), statement, MAX_LOGGED_PARAMS, repr(parameters)
+        )
+
+
+def instrument_engine(engine: Engine) -> None:
+    if event.contains(engine, "after_cursor_execute", _after_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryStats]:
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def assert_queries(max_count: int = None, n_plus_one_threshold: int = None) -> Iterator[QueryStats]:
+    """Для тестов: падает, если запросов больше max_count или есть повторы (N+1).
+
+        with assert_queries(max_count=2):
+            client.get("/api/v1/pages/")
+    """
+    with capture_queries() as stats:
+        yield stats
+    problems = []
+    if max_count is not None and stats.count > max_count:
+        problems.append(f"expected at most {max_count} queries, got {stats.count}")
+    for sql, n in stats.repeated(n_plus_one_threshold):
+        problems.append(f"N+1: statement executed {n} times: {sql}")
+    if problems:
+        raise AssertionError("\n".join(problems))
+
+
+class QueryStatsMiddleware:
+    """Считает запросы к БД на каждый HTTP-запрос.
+
+    В режиме DEBUG добавляет заголовки X-DB-Queries и X-DB-Time-Ms (учтены
+    запросы, выполненные до начала ответа). Повторяющиеся запросы пишутся
+    в лог как возможный N+1.
+    """
+
+    def __init__(self, app: ASGIApp, headers: bool = None):
+        self.app = app
+        self.headers = settings.DEBUG if headers is None else headers
+
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and self.headers:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(stats.count).encode()))
+                headers.append((b"x-db-time-ms", f"{stats.duration * 1000:.1f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _current.set(stats)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            for sql, n in stats.repeated():
+                logger.warning(
+                    "Possible N+1 in %s %s: statement executed %d times: %s",
+                    scope["method"], scope["path"], n, sql
+                )
@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import Optional, List
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey
 from sqlalchemy.orm import relationship, declarative_base
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 from app.core.config import settings
 
 
@@ -98,9 +98,8 @@ class UserInDB(UserBase):
     hashed_password: str
     is_superuser: bool
     created_at: datetime
-    
-    class Config:
-        orm_mode = True
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 class PageBase(BaseModel):
@@ -118,9 +117,25 @@ class PageInDB(PageBase):
     id: int
     created_at: datetime
     updated_at: datetime
-    
-    class Config:
-        orm_mode = True
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PageSearchHit(BaseModel):
+    id: int
+    title: str
+    slug: str
+    snippet: Optional[str] = None
+    rank: float
+    created_at: datetime
+    updated_at: datetime
+
+
+class PageSearchResults(BaseModel):
+    total: int
+    skip: int
+    limit: int
+    items: List[PageSearchHit]
 
 
 class ContactBase(BaseModel):
@@ -138,9 +153,8 @@ class ContactInDB(ContactBase):
     id: int
     is_processed: bool
     created_at: datetime
-    
-    class Config:
-        orm_mode = True
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 def create_tables(engine):
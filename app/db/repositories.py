@@ -1,8 +1,10 @@
-from typing import Optional, List, TypeVar, Generic, Type, Any
-from sqlalchemy.orm import Session
+from typing import Optional, List, TypeVar, Generic, Type, Any, Collection
+from sqlalchemy.orm import Session, joinedload, load_only, noload
 from pydantic import BaseModel
 from app.models import Base, User, Page, Contact, PageMeta
 from app.core.config import settings
+from app.db.search import get_page_search
+from app.core import invalidation
 from fastapi import HTTPException, status
 
 
@@ -10,6 +12,8 @@ ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+PAGE_META_FIELDS = ("meta_title", "meta_description", "keywords")
+
 
 class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     
@@ -19,7 +23,8 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
 
 
     def get(self, id: Any) -> Optional[ModelType]:
-        return self.db.query(self.model).filter(self.model.id == id).first()
+        # Session.get сначала смотрит identity map и не повторяет SELECT в той же сессии
+        return self.db.get(self.model, id)
 
 
     def get_multi(
@@ -29,11 +34,14 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
 
 
     def create(self, *, obj_in: CreateSchemaType) -> ModelType:
-        obj_in_data = obj_in.dict()
+        obj_in_data = obj_in.model_dump()
         db_obj = self.model(**obj_in_data)
         self.db.add(db_obj)
+        self.db.flush()
+        self._after_write(db_obj)
         self.db.commit()
         self.db.refresh(db_obj)
+        self._after_commit(db_obj)
         return db_obj
 
 
@@ -43,14 +51,17 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
-            update_data = obj_in.dict(exclude_unset=True)
+            update_data = obj_in.model_dump(exclude_unset=True)
         
         for field in update_data:
             setattr(db_obj, field, update_data[field])
         
         self.db.add(db_obj)
+        self.db.flush()
+        self._after_write(db_obj)
         self.db.commit()
         self.db.refresh(db_obj)
+        self._after_commit(db_obj)
         return db_obj
 
 
@@ -61,11 +72,30 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Object not found"
             )
+        self._before_delete(obj)
         self.db.delete(obj)
         self.db.commit()
+        self._after_delete(id)
         return obj
 
 
+    def _after_write(self, db_obj: ModelType) -> None:
+        # Вызывается после flush, в той же транзакции
+        pass
+
+
+    def _before_delete(self, db_obj: ModelType) -> None:
+        pass
+
+
+    def _after_commit(self, db_obj: ModelType) -> None:
+        pass
+
+
+    def _after_delete(self, id: Any) -> None:
+        pass
+
+
 class UserRepository(BaseRepository[User, CreateSchemaType, UpdateSchemaType]):
     
     def get_by_email(self, email: str) -> Optional[User]:
@@ -96,28 +126,61 @@ class UserRepository(BaseRepository[User, CreateSchemaType, UpdateSchemaType]):
 
 
 class PageRepository(BaseRepository[Page, CreateSchemaType, UpdateSchemaType]):
-    
-    def get_by_slug(self, slug: str) -> Optional[Page]:
-        return self.db.query(Page).filter(Page.slug == slug).first()
+
+    def __init__(self, model: Type[Page], db: Session):
+        super().__init__(model, db)
+        self.search = get_page_search(db)
+
+
+    def get_by_slug(
+        self, slug: str, *, fields: Optional[Collection[str]] = None
+    ) -> Optional[Page]:
+        return (
+            self.db.query(Page)
+            .options(*self._field_options(fields))
+            .filter(Page.slug == slug)
+            .first()
+        )
 
 
-    def get_published(self) -> List[Page]:
+    def get_published(self, *, fields: Optional[Collection[str]] = None) -> List[Page]:
         return (
             self.db.query(Page)
+            .options(*self._field_options(fields))
             .filter(Page.is_published == True)
             .order_by(Page.created_at.desc())
             .all()
         )
 
 
+    @staticmethod
+    def _field_options(fields: Optional[Collection[str]]) -> list:
+        # Без fields — страница целиком и meta одним JOIN; с fields — только
+        # запрошенные колонки, а meta не загружается, если её поля не нужны
+        if fields is None:
+            return [joinedload(Page.meta)]
+        page_columns = [
+            getattr(Page, name) for name in fields
+            if name not in PAGE_META_FIELDS and name in Page.__table__.columns
+        ]
+        meta_columns = [getattr(PageMeta, name) for name in PAGE_META_FIELDS if name in fields]
+        return [
+            load_only(*page_columns, Page.is_published),
+            joinedload(Page.meta).load_only(*meta_columns) if meta_columns else noload(Page.meta),
+        ]
+
+
     def create_with_author(
         self, *, obj_in: CreateSchemaType, author_id: int
     ) -> Page:
-        obj_in_data = obj_in.dict()
+        obj_in_data = obj_in.model_dump()
         db_obj = self.model(**obj_in_data, author_id=author_id)
         self.db.add(db_obj)
+        self.db.flush()
+        self._after_write(db_obj)
         self.db.commit()
         self.db.refresh(db_obj)
+        self._after_commit(db_obj)
         return db_obj
 
 
@@ -135,11 +198,44 @@ class PageRepository(BaseRepository[Page, CreateSchemaType, UpdateSchemaType]):
             for field, value in meta_in.items():
                 setattr(page.meta, field, value)
         
+        self.db.flush()
+        self.db.refresh(page)
+        self._after_write(page)
         self.db.commit()
         self.db.refresh(page)
+        self._after_commit(page)
         return page.meta
 
 
+    def search_published(
+        self, query: str, *, skip: int = 0, limit: int = 20
+    ) -> tuple[int, List[dict[str, Any]]]:
+        if self.search is None:
+            raise HTTPException(
+                status_code=status.HTTP_501_NOT_IMPLEMENTED,
+                detail="Search is not supported by this database"
+            )
+        return self.search.search(query, skip=skip, limit=limit)
+
+
+    def _after_write(self, db_obj: Page) -> None:
+        if self.search is not None:
+            self.search.index_page(db_obj)
+
+
+    def _before_delete(self, db_obj: Page) -> None:
+        if self.search is not None:
+            self.search.remove_page(db_obj.id)
+
+
+    def _after_commit(self, db_obj: Page) -> None:
+        invalidation.invalidate("pages", db_obj.id)
+
+
+    def _after_delete(self, id: Any) -> None:
+        invalidation.invalidate("pages", id)
+
+
 class ContactRepository(BaseRepository[Contact, CreateSchemaType, UpdateSchemaType]):
     
     def get_unprocessed(self) -> List[Contact]:
@@ -166,7 +262,7 @@ class ContactRepository(BaseRepository[Contact, CreateSchemaType, UpdateSchemaTy
     def create_with_user(
         self, *, obj_in: CreateSchemaType, user_id: Optional[int] = None
     ) -> Contact:
-        obj_in_data = obj_in.dict()
+        obj_in_data = obj_in.model_dump()
         db_obj = self.model(**obj_in_data, user_id=user_id)
         self.db.add(db_obj)
         self.db.commit()
@@ -0,0 +1,266 @@
+import html
+import re
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple, Dict, Any
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.models import Page
+
+
+SNIPPET_START = "<mark>"
+SNIPPET_END = "</mark>"
+# Маркеры из Private Use Area: БД расставляет их в исходном тексте, а в
+# <mark> они превращаются только после экранирования HTML
+MATCH_START = "\ue000"
+MATCH_END = "\ue001"
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def render_snippet(snippet: Optional[str]) -> Optional[str]:
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(MATCH_START, SNIPPET_START).replace(MATCH_END, SNIPPET_END)
+
+
+def search_hit(row) -> Dict[str, Any]:
+    return {**row, "snippet": render_snippet(row["snippet"])}
+
+
+def page_document(page: Page) -> Dict[str, Any]:
+    return {
+        "page_id": page.id,
+        "title": page.title or "",
+        "content": page.content or "",
+        "keywords": page.meta.keywords if page.meta and page.meta.keywords else "",
+    }
+
+
+class PageSearchIndex(ABC):
+    """Полнотекстовый индекс опубликованных страниц"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+
+    def is_empty(self, connection: Connection) -> bool:
+        return connection.execute(text("SELECT 1 FROM page_search LIMIT 1")).first() is None
+
+
+    @abstractmethod
+    def create(self, connection: Connection) -> None:
+        ...
+
+
+    def index_page(self, page: Page) -> None:
+        if not page.is_published:
+            self.remove_page(page.id)
+            return
+        self._upsert(page_document(page))
+
+
+    @abstractmethod
+    def remove_page(self, page_id: int) -> None:
+        ...
+
+
+    @abstractmethod
+    def rebuild(self) -> None:
+        ...
+
+
+    @abstractmethod
+    def search(
+        self, query: str, *, skip: int = 0, limit: int = 20
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        ...
+
+
+    @abstractmethod
+    def _upsert(self, document: Dict[str, Any]) -> None:
+        ...
+
+
+class SqlitePageSearchIndex(PageSearchIndex):
+    # FTS5, rowid совпадает с pages.id
+
+    def create(self, connection: Connection) -> None:
+        connection.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS page_search USING fts5("
+            "title, content, keywords, tokenize='unicode61 remove_diacritics 2')"
+        ))
+
+
+    def remove_page(self, page_id: int) -> None:
+        self.db.execute(text("DELETE FROM page_search WHERE rowid = :page_id"), {"page_id": page_id})
+
+
+    def rebuild(self) -> None:
+        self.db.execute(text("DELETE FROM page_search"))
+        self.db.execute(text(
+            "INSERT INTO page_search (rowid, title, content, keywords) "
+            "SELECT p.id, p.title, coalesce(p.content, ''), coalesce(m.keywords, '') "
+            "FROM pages p LEFT JOIN page_meta m ON m.page_id = p.id "
+            "WHERE p.is_published"
+        ))
+        self.db.commit()
+
+
+    def _upsert(self, document: Dict[str, Any]) -> None:
+        self.remove_page(document["page_id"])
+        self.db.execute(
+            text(
+                "INSERT INTO page_search (rowid, title, content, keywords) "
+                "VALUES (:page_id, :title, :content, :keywords)"
+            ),
+            document
+        )
+
+
+    def search(
+        self, query: str, *, skip: int = 0, limit: int = 20
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        match = self._match_expression(query)
+        if not match:
+            return 0, []
+
+        total = self.db.execute(
+            text("SELECT count(*) FROM page_search WHERE page_search MATCH :match"),
+            {"match": match}
+        ).scalar_one()
+        rows = self.db.execute(
+            text(
+                "SELECT p.id, p.title, p.slug, p.created_at, p.updated_at, "
+                "snippet(page_search, -1, :start, :end, '…', 24) AS snippet, "
+                "-bm25(page_search, 10.0, 1.0, 5.0) AS rank "
+                "FROM page_search JOIN pages p ON p.id = page_search.rowid "
+                "WHERE page_search MATCH :match "
+                "ORDER BY bm25(page_search, 10.0, 1.0, 5.0) "
+                "LIMIT :limit OFFSET :skip"
+            ),
+            {"match": match, "start": MATCH_START, "end": MATCH_END, "limit": limit, "skip": skip}
+        ).mappings().all()
+        return total, [search_hit(row) for row in rows]
+
+
+    @staticmethod
+    def _match_expression(query: str) -> str:
+        # Пользовательский ввод не должен попадать в синтаксис FTS5 как есть
+        tokens = TOKEN_RE.findall(query)
+        if not tokens:
+            return ""
+        terms = [f'"{token}"' for token in tokens]
+        terms[-1] += "*"
+        return " ".join(terms)
+
+
+class PostgresPageSearchIndex(PageSearchIndex):
+    # tsvector с весами A/B/C и GIN-индексом
+
+    config = "simple"
+
+
+    def create(self, connection: Connection) -> None:
+        connection.execute(text(
+            "CREATE TABLE IF NOT EXISTS page_search ("
+            "page_id INTEGER PRIMARY KEY REFERENCES pages(id) ON DELETE CASCADE, "
+            "document tsvector NOT NULL)"
+        ))
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_page_search_document ON page_search USING GIN (document)"
+        ))
+
+
+    def remove_page(self, page_id: int) -> None:
+        self.db.execute(text("DELETE FROM page_search WHERE page_id = :page_id"), {"page_id": page_id})
+
+
+    def rebuild(self) -> None:
+        self.db.execute(text("DELETE FROM page_search"))
+        self.db.execute(
+            text(
+                "INSERT INTO page_search (page_id, document) "
+                "SELECT p.id, "
+                "setweight(to_tsvector(CAST(:config AS regconfig), p.title), 'A') || "
+                "setweight(to_tsvector(CAST(:config AS regconfig), coalesce(m.keywords, '')), 'B') || "
+                "setweight(to_tsvector(CAST(:config AS regconfig), coalesce(p.content, '')), 'C') "
+                "FROM pages p LEFT JOIN page_meta m ON m.page_id = p.id "
+                "WHERE p.is_published"
+            ),
+            {"config": self.config}
+        )
+        self.db.commit()
+
+
+    def _upsert(self, document: Dict[str, Any]) -> None:
+        self.db.execute(
+            text(
+                "INSERT INTO page_search (page_id, document) VALUES (:page_id, "
+                "setweight(to_tsvector(CAST(:config AS regconfig), :title), 'A') || "
+                "setweight(to_tsvector(CAST(:config AS regconfig), :keywords), 'B') || "
+                "setweight(to_tsvector(CAST(:config AS regconfig), :content), 'C')) "
+                "ON CONFLICT (page_id) DO UPDATE SET document = EXCLUDED.document"
+            ),
+            {**document, "config": self.config}
+        )
+
+
+    def search(
+        self, query: str, *, skip: int = 0, limit: int = 20
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        params = {
+            "query": query,
+            "config": self.config,
+            "options": f"StartSel={MATCH_START},StopSel={MATCH_END},MaxFragments=1,MaxWords=32",
+            "limit": limit,
+            "skip": skip,
+        }
+        total = self.db.execute(
+            text(
+                "SELECT count(*) FROM page_search "
+                "WHERE document @@ websearch_to_tsquery(CAST(:config AS regconfig), :query)"
+            ),
+            params
+        ).scalar_one()
+        rows = self.db.execute(
+            text(
+                "SELECT p.id, p.title, p.slug, p.created_at, p.updated_at, "
+                "ts_headline(CAST(:config AS regconfig), coalesce(p.content, ''), q, :options) AS snippet, "
+                "ts_rank_cd(s.document, q) AS rank "
+                "FROM page_search s JOIN pages p ON p.id = s.page_id, "
+                "websearch_to_tsquery(CAST(:config AS regconfig), :query) q "
+                "WHERE s.document @@ q "
+                "ORDER BY rank DESC, p.id "
+                "LIMIT :limit OFFSET :skip"
+            ),
+            params
+        ).mappings().all()
+        return total, [search_hit(row) for row in rows]
+
+
+SEARCH_BACKENDS = {
+    "sqlite": SqlitePageSearchIndex,
+    "postgresql": PostgresPageSearchIndex,
+}
+
+
+def get_page_search(db: Session) -> Optional[PageSearchIndex]:
+    backend = SEARCH_BACKENDS.get(db.get_bind().dialect.name)
+    return backend(db) if backend else None
+
+
+def create_search_index(engine: Engine) -> None:
+    backend = SEARCH_BACKENDS.get(engine.dialect.name)
+    if backend is None:
+        return
+    with engine.begin() as connection:
+        index = backend(None)
+        index.create(connection)
+        empty = index.is_empty(connection)
+    if empty:
+        # Новый индекс заполняется существующими страницами, дальше его
+        # поддерживают хуки записи в PageRepository
+        with Session(engine) as db:
+            backend(db).rebuild()
@@ -1,26 +1,97 @@
-import uvicorn
+import logging
+from contextlib import asynccontextmanager
 
+import anyio
+import anyio.to_thread
 from fastapi import FastAPI, Depends, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.exceptions import RequestValidationError
 from fastapi.encoders import jsonable_encoder
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
+from sqlalchemy.exc import SQLAlchemyError
+
 from app.core.config import settings
-from app.api.v1.endpoints import pages, contacts, auth
-from app.db.session import SessionLocal, engine
-from app.models import Base
+from app.api.v1.endpoints import pages, contacts, auth, seo
+from app.db.session import engine
 from app.core.security import get_current_active_user
 from app.core.logging import configure_logging
+from app.core.assets import asset_manifest, FingerprintedStaticFiles
+from app.core.admission import AdmissionMiddleware
+from app.core.metrics import MetricsMiddleware, authorize_scrape, metrics
+from app.core.ratelimit import rate_limit
+from app.db.instrumentation import QueryStatsMiddleware, instrument_engine
+
+
+logger = logging.getLogger(__name__)
+
+
+def init_database() -> None:
+    from app.models import Base
+    from app.db.search import create_search_index
+
+    try:
+        Base.metadata.create_all(bind=engine)
+        create_search_index(engine)
+    except SQLAlchemyError as e:
+        # Воркер поднимается и без БД: /health отвечает, запросы к БД получат ошибку
+        logger.error("Database initialisation failed: %s", e)
+
+
+def build_assets() -> None:
+    from app.core.frontend import frontend
+
+    asset_manifest.build()
+    frontend.build()
+
 
+async def run_startup_tasks() -> None:
+    # Слушатели событий движка наследуются воркерами при fork вместе с engine
+    instrument_engine(engine)
+    async with anyio.create_task_group() as tg:
+        if settings.DB_CREATE_TABLES:
+            tg.start_soon(anyio.to_thread.run_sync, init_database)
+        tg.start_soon(anyio.to_thread.run_sync, build_assets)
 
-configure_logging()
 
+def preload() -> None:
+    # Мастер выполняет стартовые задачи один раз, воркеры получают результат через fork
+    configure_logging()
+    anyio.run(run_startup_tasks)
+    app.state.preloaded = True
 
-Base.metadata.create_all(bind=engine)
+
+def post_fork() -> None:
+    # Пул соединений мастера не должен использоваться в дочерних процессах
+    engine.dispose(close=False)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_logging()
+    if not getattr(app.state, "preloaded", False):
+        await run_startup_tasks()
+
+    from app.core.invalidation import start_bus, stop_bus
+
+    bus = start_bus()
+    if bus is None:
+        yield
+        return
+
+    from app.services.sitemap_service import site_index
+
+    # Изменения страниц в других воркерах инвалидируют локальный sitemap
+    bus.subscribe("pages", site_index.mark_stale, site_index.invalidate)
+    try:
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(bus.run)
+            yield
+            tg.cancel_scope.cancel()
+    finally:
+        await anyio.to_thread.run_sync(stop_bus)
 
 
 app = FastAPI(
@@ -29,7 +100,8 @@ app = FastAPI(
     description=settings.DESCRIPTION,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 
@@ -43,20 +115,55 @@ if settings.BACKEND_CORS_ORIGINS:
     )
 
 
+app.add_middleware(QueryStatsMiddleware)
+
+
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware)
+
+
+if settings.PROFILING_ENABLED:
+    from app.core.profiling import ProfilingMiddleware
+
+    app.add_middleware(ProfilingMiddleware, sample_rate=settings.PROFILING_SAMPLE_RATE)
+
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, registry=metrics)
+
+
 app.mount(
     "/static",
-    StaticFiles(directory=str(settings.STATIC_DIR)),
+    FingerprintedStaticFiles(
+        manifest=asset_manifest,
+        prefix="static",
+        directory=str(settings.STATIC_DIR)
+    ),
     name="static"
 )
 
+app.mount(
+    "/assets",
+    FingerprintedStaticFiles(
+        manifest=asset_manifest,
+        prefix="assets",
+        directory=str(settings.TEMPLATE_DIR / "assets")
+    ),
+    name="assets"
+)
+
 
-templates = Jinja2Templates(directory=str(settings.TEMPLATE_DIR))
+templates = Jinja2Templates(
+    directory=[str(settings.TEMPLATE_BUILD_DIR), str(settings.TEMPLATE_DIR)]
+)
+templates.env.globals["asset_url"] = asset_manifest.url_for
 
 
 app.include_router(
     auth.router,
     prefix=settings.API_V1_STR,
-    tags=["auth"]
+    tags=["auth"],
+    dependencies=[Depends(rate_limit("auth"))]
 )
 
 app.include_router(
@@ -72,6 +179,16 @@ app.include_router(
     tags=["contacts"]
 )
 
+app.include_router(seo.router)
+
+if settings.PROFILING_ENABLED:
+    from app.api.v1.endpoints import profiles
+
+    app.include_router(
+        profiles.router,
+        prefix=settings.API_V1_STR
+    )
+
 
 @app.exception_handler(StarletteHTTPException)
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
@@ -82,7 +199,8 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
             "status_code": exc.status_code,
             "detail": exc.detail
         },
-        status_code=exc.status_code
+        status_code=exc.status_code,
+        headers=getattr(exc, "headers", None)
     )
 
 
@@ -107,17 +225,31 @@ async def health_check():
     return {"status": "ok", "version": settings.PROJECT_VERSION}
 
 
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    response = await call_next(request)
-    return response
+@app.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    include_in_schema=False,
+    dependencies=[Depends(authorize_scrape)]
+)
+async def read_metrics():
+    return PlainTextResponse(
+        metrics.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
 
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "main:app",
-        host=settings.SERVER_HOST,
-        port=settings.SERVER_PORT,
-        reload=settings.DEBUG,
-        log_level=settings.LOG_LEVEL.lower()
-    )
+    from app.core.server import parse_args, run_reload, serve
+
+    args = parse_args()
+    if args.reload:
+        run_reload("app.main:app", host=args.host, port=args.port)
+    else:
+        serve(
+            app,
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            preload=preload,
+            post_fork=post_fork
+        )
@@ -0,0 +1,157 @@
+import asyncio
+import itertools
+import threading
+from collections import deque
+from typing import Any, AsyncIterator, Deque, List, NamedTuple, Optional
+
+from app.core.serialization import type_adapter, validate
+from app.db.models import ContactInDB
+
+
+FEED_HISTORY = 1000
+FEED_MAX_LAG = 256
+FEED_KEEPALIVE = 15.0
+FEED_RETRY_MS = 3000
+
+
+class FeedEvent(NamedTuple):
+    id: int
+    frame: bytes
+
+
+def _frame(event_id: int, event: str, data: bytes) -> bytes:
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (event_id, event.encode(), data)
+
+
+class Broadcaster:
+    """Раздача событий SSE-подписчикам внутри процесса.
+
+    События хранятся в одном кольцевом буфере уже закодированными кадрами, а
+    у подписчика есть только курсор — номер последнего отправленного события.
+    Очередь подписчика — это участок буфера после курсора, её размер ограничен
+    `max_lag`: кто отстал сильнее (медленный клиент не успевает читать),
+    отключается и переподключается с Last-Event-ID. Если нужного события уже
+    нет в буфере, клиент получает `reset` и перечитывает список целиком.
+    """
+
+    def __init__(
+        self,
+        history: int = FEED_HISTORY,
+        max_lag: int = FEED_MAX_LAG,
+        keepalive: float = FEED_KEEPALIVE
+    ):
+        self.max_lag = max_lag
+        self.keepalive = keepalive
+        self.subscribers = 0
+        self.dropped = 0
+        self._events: Deque[FeedEvent] = deque(maxlen=history)
+        self._last_id = 0
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._ticker: Optional[asyncio.TimerHandle] = None
+
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+
+    def publish(self, event: str, data: bytes) -> int:
+        # Может вызываться и из пула потоков (синхронные репозитории)
+        with self._lock:
+            self._last_id += 1
+            event_id = self._last_id
+            self._events.append(FeedEvent(event_id, _frame(event_id, event, data)))
+
+        loop = self._loop
+        if loop is None:
+            return event_id
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._notify()
+        else:
+            try:
+                loop.call_soon_threadsafe(self._notify)
+            except RuntimeError:
+                pass
+        return event_id
+
+
+    async def stream(self, last_event_id: Optional[int] = None) -> AsyncIterator[bytes]:
+        self._bind()
+        cursor = self._last_id if last_event_id is None else last_event_id
+        # При возобновлении можно догнать весь буфер, дальше действует max_lag
+        limit = self._events.maxlen if last_event_id is not None else self.max_lag
+        self.subscribers += 1
+        try:
+            yield b"retry: %d\n\n" % FEED_RETRY_MS
+            while True:
+                wakeup = self._wakeup
+                pending = self._since(cursor)
+                if pending is None:
+                    cursor = self._last_id
+                    yield _frame(cursor, "reset", b"{}")
+                    continue
+                if len(pending) > limit:
+                    self.dropped += 1
+                    return
+                limit = self.max_lag
+                if pending:
+                    cursor = pending[-1].id
+                    yield b"".join(event.frame for event in pending)
+                    continue
+                # Таймер keepalive один на всех: свой таймаут на каждое ожидание
+                # у тысяч подписчиков стоил бы дороже самой раздачи
+                await wakeup.wait()
+                if self._last_id == cursor:
+                    yield b": ping\n\n"
+        finally:
+            self.subscribers -= 1
+
+
+    def _since(self, cursor: int) -> Optional[List[FeedEvent]]:
+        with self._lock:
+            if cursor == self._last_id:
+                return []
+            oldest = self._events[0].id if self._events else self._last_id + 1
+            if cursor > self._last_id or cursor < oldest - 1:
+                return None
+            return list(itertools.islice(self._events, cursor - oldest + 1, None))
+
+
+    def _bind(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._ticker = None
+        if self._ticker is None:
+            self._ticker = loop.call_later(self.keepalive, self._tick)
+
+
+    def _tick(self) -> None:
+        self._notify()
+        if self.subscribers:
+            self._ticker = self._loop.call_later(self.keepalive, self._tick)
+        else:
+            self._ticker = None
+
+
+    def _notify(self) -> None:
+        wakeup, self._wakeup = self._wakeup, asyncio.Event()
+        if wakeup is not None:
+            wakeup.set()
+
+
+class ContactFeed(Broadcaster):
+
+    def publish_contact(self, event: str, contact: Any) -> int:
+        adapter = type_adapter(ContactInDB)
+        return self.publish(event, adapter.dump_json(validate(ContactInDB, contact)))
+
+
+contact_feed = ContactFeed()
@@ -1,7 +1,9 @@
-from typing import List, Optional, Dict, Any
+from typing import Callable, List, Optional, Dict, Any, FrozenSet
 from fastapi import HTTPException, status, Depends
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from app.db.repositories import PageRepository, get_page_repository
+from app.db.repositories import PAGE_META_FIELDS, PageRepository, get_page_repository
+from app.db.session import SessionLocal, get_db
 from app.models import Page, PageMeta
 
 from app.schemas.page import (
@@ -13,14 +15,24 @@ from app.schemas.page import (
     PageMetaUpdate
 )
 
+from app.db.models import PageSearchHit, PageSearchResults
+from app.services.sitemap_service import site_index
+from app.core.config import settings
+from app.core.serialization import projection, validate
+from app.core.singleflight import coalesce
 from app.core.security import get_current_active_user
 from app.models import User
 
 
 class PageService:
     
-    def __init__(self, page_repo: PageRepository):
+    def __init__(
+        self,
+        page_repo: PageRepository,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
         self.page_repo = page_repo
+        self.session_factory = session_factory
 
 
     async def get_page_by_id(self, page_id: int) -> PageInDB:
@@ -30,22 +42,57 @@ class PageService:
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Page not found"
             )
-        return PageInDB.from_orm(page)
+        return PageInDB.model_validate(page)
     
 
-    async def get_page_by_slug(self, slug: str) -> PageWithMeta:
-        page = self.page_repo.get_by_slug(slug)
-        if not page or not page.is_published:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Page not found or not published"
-            )
-        return self._add_meta_to_page(page)
+    @coalesce(timeout=settings.SINGLE_FLIGHT_TIMEOUT)
+    async def get_page_by_slug(
+        self,
+        slug: str,
+        fields: Optional[FrozenSet[str]] = None
+    ) -> PageWithMeta:
+        # Запрос уходит в пул потоков, иначе одновременные чтения всё равно
+        # выполнялись бы по очереди в цикле событий и склеивать было бы нечего
+        return await run_in_threadpool(self._load_published_page, slug, fields)
+
+
+    def _load_published_page(self, slug: str, fields: Optional[FrozenSet[str]]) -> PageWithMeta:
+        # Общий запуск может пережить запрос ведущего (таймаут, отмена), а его
+        # сессию закроет get_db — поэтому у запуска своя сессия
+        with self.session_factory() as db:
+            page = PageRepository(Page, db).get_by_slug(slug, fields=fields)
+            if not page or not page.is_published:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Page not found or not published"
+                )
+            return validate(projection(PageWithMeta, fields), page_row(page, fields))
+    
+
+    async def list_published_pages(
+        self,
+        fields: Optional[FrozenSet[str]] = None
+    ) -> List[PageWithMeta]:
+        pages = self.page_repo.get_published(fields=fields)
+        return validate(
+            List[projection(PageWithMeta, fields)],
+            [page_row(page, fields) for page in pages]
+        )
     
 
-    async def list_published_pages(self) -> List[PageWithMeta]:
-        pages = self.page_repo.get_published()
-        return [self._add_meta_to_page(page) for page in pages]
+    async def search_pages(
+        self,
+        query: str,
+        skip: int = 0,
+        limit: int = 20
+    ) -> PageSearchResults:
+        total, hits = self.page_repo.search_published(query, skip=skip, limit=limit)
+        return PageSearchResults(
+            total=total,
+            skip=skip,
+            limit=limit,
+            items=[PageSearchHit(**hit) for hit in hits]
+        )
     
 
     async def create_page(
@@ -64,7 +111,8 @@ class PageService:
             obj_in=page_create,
             author_id=current_user.id
         )
-        return PageInDB.from_orm(page)
+        site_index.update_page(page)
+        return PageInDB.model_validate(page)
     
 
     async def update_page(
@@ -88,9 +136,10 @@ class PageService:
         
         updated_page = self.page_repo.update(
             db_obj=page,
-            obj_in=page_update.dict(exclude_unset=True)
+            obj_in=page_update.model_dump(exclude_unset=True)
         )
-        return PageInDB.from_orm(updated_page)
+        site_index.update_page(updated_page)
+        return PageInDB.model_validate(updated_page)
     
 
     async def update_page_meta(
@@ -105,11 +154,10 @@ class PageService:
                 detail="Page not found"
             )
         
-        meta_data = meta_update.dict(exclude_unset=True)
-        self.page_repo.update_meta(page_id=page_id, meta_in=meta_data)
-        
-        updated_page = self.page_repo.get(page_id)
-        return self._add_meta_to_page(updated_page)
+        meta_data = meta_update.model_dump(exclude_unset=True)
+        meta = self.page_repo.update_meta(page_id=page_id, meta_in=meta_data)
+        site_index.update_page(meta.page)
+        return self._add_meta_to_page(meta.page)
     
 
     async def delete_page(
@@ -131,23 +179,28 @@ class PageService:
             )
         
         self.page_repo.delete(id=page_id)
+        site_index.remove_page(page_id)
         return {"message": "Page deleted successfully"}
 
 
     def _add_meta_to_page(self, page: Page) -> PageWithMeta:
         """Добавляет мета-данные к странице для ответа"""
-        meta_data = {
-            "meta_title": page.meta.meta_title if page.meta else None,
-            "meta_description": page.meta.meta_description if page.meta else None,
-            "keywords": page.meta.keywords if page.meta else None
-        } if hasattr(page, 'meta') else {}
-        
-        page_dict = PageInDB.from_orm(page).dict()
-        return PageWithMeta(**page_dict, **meta_data)
+        return validate(PageWithMeta, page_row(page))
+
+
+PAGE_FIELDS = ("id", "title", "slug", "content", "is_published", "created_at", "updated_at")
+
+
+def page_row(page: Page, fields: Optional[FrozenSet[str]] = None) -> Dict[str, Any]:
+    # Читаются только запрошенные атрибуты: обращение к отложенной колонке
+    # выполнило бы отдельный запрос
+    row = {name: getattr(page, name) for name in PAGE_FIELDS if fields is None or name in fields}
+    meta_fields = [name for name in PAGE_META_FIELDS if fields is None or name in fields]
+    if meta_fields:
+        meta = page.meta
+        row.update({name: getattr(meta, name) if meta else None for name in meta_fields})
+    return row
 
 
-def get_page_service(
-    db: Session = Depends(get_db),
-    page_repo: PageRepository = Depends(get_page_repository)
-) -> PageService:
-    return PageService(page_repo=page_repo)
+def get_page_service(db: Session = Depends(get_db)) -> PageService:
+    return PageService(page_repo=get_page_repository(db))
@@ -0,0 +1,332 @@
+import hashlib
+import heapq
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, NamedTuple, Optional
+from xml.sax.saxutils import escape
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Page, PageMeta
+
+
+SITEMAP_CHUNK_SIZE = 50_000
+FEED_SIZE = 50
+
+SITEMAP_MEDIA_TYPE = "application/xml"
+FEED_MEDIA_TYPE = "application/atom+xml"
+
+
+class CachedDocument(NamedTuple):
+    body: bytes
+    etag: str
+    media_type: str
+
+
+@dataclass
+class SiteEntry:
+    page_id: int
+    slug: str
+    title: str
+    summary: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+    fragment: bytes = field(default=b"", repr=False)
+
+
+def _isoformat(value: datetime) -> str:
+    return value.replace(microsecond=0).isoformat() + ("Z" if value.tzinfo is None else "")
+
+
+def _document(body: bytes, media_type: str) -> CachedDocument:
+    return CachedDocument(body, f'"{hashlib.sha1(body).hexdigest()}"', media_type)
+
+
+class SiteIndex:
+    """Sitemap и Atom-лента, которые пересобираются по частям при изменении страниц"""
+
+    def __init__(
+        self,
+        base_url: str,
+        chunk_size: int = SITEMAP_CHUNK_SIZE,
+        feed_size: int = FEED_SIZE
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.chunk_size = chunk_size
+        self.feed_size = feed_size
+        self.entries: Dict[int, SiteEntry] = {}
+        self._chunk_members: Dict[int, set] = {}
+        self._chunks: Dict[int, CachedDocument] = {}
+        self._dirty_chunks: set = set()
+        self._index: Optional[CachedDocument] = None
+        self._feed: Optional[CachedDocument] = None
+        self._feed_ids: set = set()
+        self._feed_floor: Optional[datetime] = None
+        # Сюда пишут колбэки шины инвалидации из event loop, поэтому без блокировок:
+        # deque.append и присваивание флага атомарны
+        self._stale: Deque[int] = deque()
+        self._reload = False
+        self._loading = False
+        self._lock = threading.Lock()  # только короткие операции в памяти
+        self._load_lock = threading.Lock()  # один скан БД за раз, event loop его не ждёт
+        self.loaded = False
+
+
+    @property
+    def fresh(self) -> bool:
+        return self.loaded and not self._reload and not self._stale
+
+
+    def ensure_loaded(self, session_factory: Callable[[], Session]) -> None:
+        # Первый запрос к sitemap/ленте, а не старт воркера, платит за полный скан
+        if self.fresh:
+            return
+        with self._load_lock:
+            if self.fresh:
+                return
+            with session_factory() as db:
+                if self.loaded and not self._reload:
+                    self._refresh(db)
+                else:
+                    self.load(db)
+
+
+    def mark_stale(self, page_id: int) -> None:
+        # Страницу изменил другой воркер: перечитается при следующем обращении
+        if self.loaded or self._loading:
+            self._stale.append(int(page_id))
+
+
+    def invalidate(self) -> None:
+        self._reload = True
+
+
+    def load(self, db: Session) -> None:
+        # Скан идёт без self._lock; изменения, пришедшие за это время,
+        # попадают в _stale и дочитываются следующим ensure_loaded
+        self._reload = False
+        self._loading = True
+        try:
+            entries = [self._entry(row) for row in self._query(db).yield_per(5000)]
+            for entry in entries:
+                entry.fragment = self._render_url(entry)
+            with self._lock:
+                self._replace(entries)
+        finally:
+            self._loading = False
+
+
+    def _replace(self, entries: List[SiteEntry]) -> None:
+        self.entries.clear()
+        self._chunk_members.clear()
+        self._chunks.clear()
+        for entry in entries:
+            self.entries[entry.page_id] = entry
+            self._chunk_members.setdefault(self._chunk_of(entry.page_id), set()).add(entry.page_id)
+        self._dirty_chunks = set(self._chunk_members)
+        self._index = None
+        self._feed = None
+        self.loaded = True
+
+
+    def _refresh(self, db: Session) -> None:
+        stale = set()
+        while self._stale:
+            stale.add(self._stale.popleft())
+        rows = self._query(db).filter(Page.id.in_(stale)).all()
+        with self._lock:
+            for row in rows:
+                self._upsert(self._entry(row))
+            for page_id in stale - {row.id for row in rows}:
+                self._remove(page_id)
+
+
+    @staticmethod
+    def _query(db: Session):
+        return (
+            db.query(
+                Page.id, Page.slug, Page.title, Page.created_at, Page.updated_at,
+                PageMeta.meta_description
+            )
+            .outerjoin(PageMeta, PageMeta.page_id == Page.id)
+            .filter(Page.is_published == True)
+        )
+
+
+    @staticmethod
+    def _entry(row) -> SiteEntry:
+        return SiteEntry(
+            page_id=row.id,
+            slug=row.slug,
+            title=row.title,
+            summary=row.meta_description,
+            created_at=row.created_at,
+            updated_at=row.updated_at or row.created_at
+        )
+
+
+    def update_page(self, page: Page) -> None:
+        if not page.is_published:
+            self.remove_page(page.id)
+            return
+
+        entry = SiteEntry(
+            page_id=page.id,
+            slug=page.slug,
+            title=page.title,
+            summary=page.meta.meta_description if page.meta else None,
+            created_at=page.created_at,
+            updated_at=page.updated_at or page.created_at
+        )
+        with self._lock:
+            if self.loaded:
+                self._upsert(entry)
+        if self._loading:
+            self._stale.append(page.id)
+
+
+    def remove_page(self, page_id: int) -> None:
+        with self._lock:
+            if self.loaded:
+                self._remove(page_id)
+        if self._loading:
+            self._stale.append(page_id)
+
+
+    def sitemap(self) -> CachedDocument:
+        with self._lock:
+            self._flush_chunks()
+            if len(self._chunk_members) <= 1:
+                chunk = next(iter(self._chunk_members), 0)
+                return self._chunks.get(chunk) or self._render_chunk(chunk)
+            if self._index is None:
+                self._index = self._render_index()
+            return self._index
+
+
+    def sitemap_chunk(self, chunk: int) -> Optional[CachedDocument]:
+        with self._lock:
+            self._flush_chunks()
+            return self._chunks.get(chunk)
+
+
+    def feed(self) -> CachedDocument:
+        with self._lock:
+            if self._feed is None:
+                self._feed = self._render_feed()
+            return self._feed
+
+
+    def _upsert(self, entry: SiteEntry) -> None:
+        self._put(entry)
+        self._dirty_chunks.add(self._chunk_of(entry.page_id))
+        self._index = None
+        if entry.page_id in self._feed_ids or self._feed_floor is None or entry.updated_at >= self._feed_floor:
+            self._feed = None
+
+
+    def _remove(self, page_id: int) -> None:
+        if self.entries.pop(page_id, None) is None:
+            return
+        chunk = self._chunk_of(page_id)
+        members = self._chunk_members[chunk]
+        members.discard(page_id)
+        if not members:
+            del self._chunk_members[chunk]
+            self._chunks.pop(chunk, None)
+        self._dirty_chunks.add(chunk)
+        self._index = None
+        if page_id in self._feed_ids:
+            self._feed = None
+
+
+    def _put(self, entry: SiteEntry) -> None:
+        entry.fragment = self._render_url(entry)
+        self.entries[entry.page_id] = entry
+        self._chunk_members.setdefault(self._chunk_of(entry.page_id), set()).add(entry.page_id)
+
+
+    def _chunk_of(self, page_id: int) -> int:
+        # Номер части зависит только от id, поэтому правка страницы затрагивает одну часть
+        return page_id // self.chunk_size
+
+
+    def _flush_chunks(self) -> None:
+        for chunk in self._dirty_chunks:
+            if chunk in self._chunk_members:
+                self._chunks[chunk] = self._render_chunk(chunk)
+        self._dirty_chunks.clear()
+
+
+    def _page_url(self, entry: SiteEntry) -> str:
+        return self.base_url + settings.PAGE_URL_TEMPLATE.format(slug=entry.slug)
+
+
+    def _render_url(self, entry: SiteEntry) -> bytes:
+        return (
+            f"<url><loc>{escape(self._page_url(entry))}</loc>"
+            f"<lastmod>{_isoformat(entry.updated_at)}</lastmod></url>"
+        ).encode("utf-8")
+
+
+    def _render_chunk(self, chunk: int) -> CachedDocument:
+        members = sorted(self._chunk_members.get(chunk, ()))
+        body = b"".join([
+            b'<?xml version="1.0" encoding="UTF-8"?>\n',
+            b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+            *(self.entries[page_id].fragment for page_id in members),
+            b"</urlset>\n",
+        ])
+        return _document(body, SITEMAP_MEDIA_TYPE)
+
+
+    def _render_index(self) -> CachedDocument:
+        parts = [
+            '<?xml version="1.0" encoding="UTF-8"?>\n',
+            '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+        ]
+        for chunk in sorted(self._chunk_members):
+            lastmod = max(self.entries[page_id].updated_at for page_id in self._chunk_members[chunk])
+            parts.append(
+                f"<sitemap><loc>{escape(self.base_url)}/sitemaps/sitemap-{chunk}.xml</loc>"
+                f"<lastmod>{_isoformat(lastmod)}</lastmod></sitemap>"
+            )
+        parts.append("</sitemapindex>\n")
+        return _document("".join(parts).encode("utf-8"), SITEMAP_MEDIA_TYPE)
+
+
+    def _render_feed(self) -> CachedDocument:
+        latest: List[SiteEntry] = heapq.nlargest(
+            self.feed_size, self.entries.values(), key=lambda e: (e.updated_at, e.page_id)
+        )
+        self._feed_ids = {entry.page_id for entry in latest}
+        self._feed_floor = latest[-1].updated_at if len(latest) == self.feed_size else None
+
+        updated = latest[0].updated_at if latest else datetime.utcnow()
+        parts = [
+            '<?xml version="1.0" encoding="UTF-8"?>\n',
+            '<feed xmlns="http://www.w3.org/2005/Atom">',
+            f"<title>{escape(settings.PROJECT_NAME)}</title>",
+            f'<link rel="self" href="{escape(self.base_url)}/feed.xml"/>',
+            f'<link href="{escape(self.base_url)}/"/>',
+            f"<id>{escape(self.base_url)}/</id>",
+            f"<updated>{_isoformat(updated)}</updated>",
+        ]
+        for entry in latest:
+            url = escape(self._page_url(entry))
+            parts.append(
+                f"<entry><title>{escape(entry.title)}</title>"
+                f'<link href="{url}"/><id>{url}</id>'
+                f"<published>{_isoformat(entry.created_at)}</published>"
+                f"<updated>{_isoformat(entry.updated_at)}</updated>"
+                + (f"<summary>{escape(entry.summary)}</summary>" if entry.summary else "")
+                + "</entry>"
+            )
+        parts.append("</feed>\n")
+        return _document("".join(parts).encode("utf-8"), FEED_MEDIA_TYPE)
+
+
+site_index = SiteIndex(base_url=str(settings.SERVER_HOST))
@@ -0,0 +1,99 @@
+"""Нагрузка на Broadcaster ленты контактов: тысячи простаивающих подписчиков.
+
+    python -m benchmarks.feed_benchmark [subscribers]
+
+Подписчики читают генератор `stream()` напрямую, без HTTP: измеряется
+стоимость самого broadcaster'а — память на подписчика, CPU в простое,
+время доставки события всем и отключение медленного клиента.
+"""
+import asyncio
+import sys
+import time
+import tracemalloc
+
+from app.services.contact_feed_service import Broadcaster
+
+
+IDLE_SECONDS = 3.0
+EVENTS = 50
+
+
+class Progress:
+    def __init__(self, subscribers: int):
+        self.subscribers = subscribers
+        self.finished = 0
+        self.done = asyncio.Event()
+
+
+    def finish(self) -> None:
+        self.finished += 1
+        if self.finished == self.subscribers:
+            self.done.set()
+
+
+async def subscriber(feed: Broadcaster, progress: Progress, ready: asyncio.Event) -> None:
+    stream = feed.stream()
+    await stream.__anext__()  # retry:
+    ready.set()
+    events = 0
+    async for chunk in stream:
+        events += chunk.count(b"\nevent: ")
+        if events == EVENTS:
+            progress.finish()
+
+
+async def slow_subscriber(feed: Broadcaster) -> bool:
+    stream = feed.stream()
+    await stream.__anext__()
+    # Не читает, пока не накопится больше max_lag событий, затем должен быть отключён
+    while feed.last_id < feed.max_lag + 10:
+        await asyncio.sleep(0.01)
+    chunks = [chunk async for chunk in stream]
+    return not chunks
+
+
+async def run(count: int) -> None:
+    feed = Broadcaster(keepalive=60.0)
+    progress = Progress(count)
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    readiness = [asyncio.Event() for _ in range(count)]
+    tasks = [
+        asyncio.create_task(subscriber(feed, progress, ready))
+        for ready in readiness
+    ]
+    for ready in readiness:
+        await ready.wait()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{count} subscribers: {(after - before) / count / 1024:.1f} KiB each (tracemalloc)")
+
+    cpu = time.process_time()
+    await asyncio.sleep(IDLE_SECONDS)
+    idle_cpu = time.process_time() - cpu
+    print(f"idle for {IDLE_SECONDS:.0f} s: {idle_cpu * 1000:.1f} ms CPU")
+
+    start = time.perf_counter()
+    for i in range(EVENTS):
+        feed.publish("contact.created", b'{"id": %d}' % i)
+        await asyncio.sleep(0)
+    await progress.done.wait()
+    elapsed = time.perf_counter() - start
+    print(f"{EVENTS} events to all subscribers: {elapsed * 1000:.0f} ms "
+          f"({elapsed / (EVENTS * count) * 1e6:.2f} us per delivery)")
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    slow_feed = Broadcaster(keepalive=60.0)
+    slow = asyncio.create_task(slow_subscriber(slow_feed))
+    await asyncio.sleep(0)
+    for i in range(slow_feed.max_lag + 10):
+        slow_feed.publish("contact.created", b"{}")
+    print(f"slow consumer dropped: {await slow} (dropped={slow_feed.dropped})")
+
+
+if __name__ == "__main__":
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
@@ -0,0 +1,401 @@
+"""Нагрузочный стенд для HTTP-эндпоинтов, приложение вызывается напрямую через ASGI.
+
+    python -m benchmarks.harness run --rows 1k --requests 500 --output result.json
+    python -m benchmarks.harness run --rows 100k --save main
+    python -m benchmarks.harness compare result.json --baseline main --threshold 0.15
+
+База SQLite засевается один раз на каждый размер и переиспользуется
+(build/bench/pages-<rows>.db). Аутентификация подменяется через
+dependency_overrides, чтобы замер не упирался в bcrypt из fake_users_db.
+Rate limiting и admission control выключены: все запросы стенда идут с
+одного адреса, и замер показывал бы 429/503 вместо работы обработчиков.
+
+Baseline — это benchmarks/baselines/<имя>.json, он хранится в репозитории.
+Снимается на эталонной машине и обновляется вместе с изменением,
+которое осознанно меняет производительность:
+
+    python -m benchmarks.harness run --rows 10k --requests 1000 --save main
+    git add benchmarks/baselines/main.json
+
+Пока baseline не снят, compare завершается с кодом 2 и подсказкой, как его
+снять, а не сравнивает с пустым результатом.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+BENCH_DIR = ROOT_DIR / "build" / "bench"
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+
+class Endpoint:
+
+    def __init__(
+        self,
+        name: str,
+        route: str,
+        method: str = "GET",
+        params: Callable[[random.Random, Dict[str, int]], Dict[str, Any]] = None,
+        body: Callable[[random.Random], Dict[str, Any]] = None
+    ):
+        self.name = name
+        self.route = route
+        self.method = method
+        self.params = params or (lambda rng, sizes: {})
+        self.body = body
+
+
+ENDPOINTS = [
+    Endpoint("home", "read_root"),
+    Endpoint("health", "health_check"),
+    Endpoint("pages_list", "get_all_pages"),
+    Endpoint(
+        "page_detail", "get_page",
+        params=lambda rng, sizes: {"page_slug": f"page-{rng.randint(1, sizes['pages'])}"}
+    ),
+    Endpoint("contacts_list", "read_contacts"),
+    Endpoint(
+        "contact_detail", "read_contact",
+        params=lambda rng, sizes: {"contact_id": rng.randint(1, sizes["contacts"])}
+    ),
+    Endpoint(
+        "contact_create", "create_contact", method="POST",
+        body=lambda rng: {
+            "name": "Bench User",
+            "email": f"bench{rng.randint(1, 10**9)}@example.com",
+            "phone": "+79991234567",
+            "message": "benchmark",
+        }
+    ),
+]
+
+
+def parse_size(value: str) -> int:
+    return SIZES.get(value.lower()) or int(value)
+
+
+def database_path(rows: int) -> Path:
+    return BENCH_DIR / f"pages-{rows}.db"
+
+
+def configure_environment(rows: int) -> None:
+    # До первого импорта app.*: settings читаются из окружения один раз
+    os.environ.setdefault("ENV", "testing")
+    os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{database_path(rows)}"
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    os.environ["ADMISSION_ENABLED"] = "false"
+    os.environ["INVALIDATION_TRANSPORT"] = "none"
+
+
+def seed_database(rows: int) -> Path:
+    from sqlalchemy import create_engine
+
+    from app.db.models import Base, Page, PageMeta
+    from app.db.search import create_search_index, get_page_search
+    from sqlalchemy.orm import Session
+
+    BENCH_DIR.mkdir(parents=True, exist_ok=True)
+    path = database_path(rows)
+    if path.exists():
+        return path
+
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.unlink(missing_ok=True)
+    engine = create_engine(f"sqlite:///{tmp_path}")
+    Base.metadata.create_all(bind=engine)
+    create_search_index(engine)
+
+    rng = random.Random(1)
+    now = datetime.utcnow()
+    with Session(engine) as session:
+        for start in range(1, rows + 1, 10_000):
+            stop = min(start + 10_000, rows + 1)
+            session.execute(Page.__table__.insert(), [
+                {
+                    "id": i,
+                    "title": f"Page {i}",
+                    "slug": f"page-{i}",
+                    "content": "lorem ipsum dolor sit amet " * rng.randint(5, 60),
+                    "is_published": True,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for i in range(start, stop)
+            ])
+            session.execute(PageMeta.__table__.insert(), [
+                {"page_id": i, "meta_title": f"Page {i}", "keywords": "bench"}
+                for i in range(start, stop, 3)
+            ])
+        session.commit()
+        get_page_search(session).rebuild()
+    engine.dispose()
+    os.replace(tmp_path, path)
+    return path
+
+
+def seed_contacts(rows: int) -> None:
+    from app.api.v1.endpoints.contacts import fake_db
+
+    now = datetime.utcnow()
+    fake_db.contacts = [
+        {
+            "id": i,
+            "name": f"Contact {i}",
+            "email": f"contact{i}@example.com",
+            "phone": "+79991234567",
+            "message": "hello",
+            "created_at": now,
+            "is_processed": False,
+        }
+        for i in range(1, rows + 1)
+    ]
+    fake_db.next_id = rows + 1
+
+
+def load_app():
+    from app.main import app
+    from app.core.security import UserInDB, get_current_active_user, get_current_user
+
+    bench_user = UserInDB(
+        username="bench",
+        hashed_password="",
+        scopes=["admin", "user"]
+    )
+    app.dependency_overrides[get_current_user] = lambda: bench_user
+    app.dependency_overrides[get_current_active_user] = lambda: bench_user
+    return app
+
+
+async def call(app, method: str, path: str, body: Optional[bytes] = None) -> Tuple[int, int]:
+    path, _, query = path.partition("?")
+    headers = [(b"host", b"bench"), (b"accept-encoding", b"gzip")]
+    if body is not None:
+        headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.3"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": headers,
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    request_sent = False
+    status = 0
+    size = 0
+
+    async def receive():
+        nonlocal request_sent
+        if request_sent:
+            await asyncio.sleep(3600)
+        request_sent = True
+        return {"type": "http.request", "body": body or b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status, size
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, size
+
+
+def percentile(values: List[float], q: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+async def bench_endpoint(
+    app, endpoint: Endpoint, sizes: Dict[str, int], requests: int, concurrency: int, warmup: int
+) -> Dict[str, Any]:
+    rng = random.Random(endpoint.name)
+
+    def next_request() -> Tuple[str, Optional[bytes]]:
+        path = app.url_path_for(endpoint.route, **endpoint.params(rng, sizes))
+        body = json.dumps(endpoint.body(rng)).encode() if endpoint.body else None
+        return path, body
+
+    for _ in range(warmup):
+        await call(app, endpoint.method, *next_request())
+
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    response_bytes = 0
+
+    async def worker(count: int) -> None:
+        nonlocal response_bytes
+        for _ in range(count):
+            path, body = next_request()
+            start = time.perf_counter()
+            status, size = await call(app, endpoint.method, path, body)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+            response_bytes += size
+
+    per_worker = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(count) for count in per_worker if count))
+    elapsed = time.perf_counter() - start
+
+    samples = max(1, min(20, requests // 10))
+    tracemalloc.start()
+    peaks = []
+    for _ in range(samples):
+        path, body = next_request()
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        await call(app, endpoint.method, path, body)
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+
+    return {
+        "requests": len(latencies),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "alloc_peak_kib": statistics.median(peaks) / 1024,
+        "avg_response_bytes": response_bytes / max(len(latencies), 1),
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+
+async def run_suite(args) -> Dict[str, Any]:
+    rows = parse_size(args.rows)
+    configure_environment(rows)
+    seed_database(rows)
+    app = load_app()
+    sizes = {"pages": rows, "contacts": min(rows, args.contacts_cap)}
+    seed_contacts(sizes["contacts"])
+
+    selected = set(args.endpoints.split(",")) if args.endpoints else None
+    results = {}
+    async with app.router.lifespan_context(app):
+        for endpoint in ENDPOINTS:
+            if selected and endpoint.name not in selected:
+                continue
+            result = await bench_endpoint(
+                app, endpoint, sizes, args.requests, args.concurrency, args.warmup
+            )
+            results[endpoint.name] = result
+            print(
+                f"{endpoint.name:16} p50 {result['p50_ms']:9.3f} ms  p99 {result['p99_ms']:9.3f} ms  "
+                f"{result['throughput_rps']:9.1f} req/s  alloc {result['alloc_peak_kib']:9.1f} KiB  "
+                f"{result['statuses']}"
+            )
+
+    return {
+        "rows": rows,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "created_at": datetime.utcnow().isoformat(),
+        "endpoints": results,
+    }
+
+
+def find_baseline(name: str) -> Optional[Path]:
+    for path in (Path(name), BASELINE_DIR / f"{name}.json"):
+        if path.is_file():
+            return path
+    return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    regressions = []
+    if not current["endpoints"].keys() & baseline.get("endpoints", {}).keys():
+        return ["no endpoints in common with the baseline, nothing was compared"]
+    if current.get("rows") != baseline.get("rows"):
+        regressions.append(
+            f"data size differs: {current.get('rows')} rows vs baseline {baseline.get('rows')}"
+        )
+    for name, result in current["endpoints"].items():
+        reference = baseline["endpoints"].get(name)
+        if reference is None:
+            continue
+        for metric in ("p50_ms", "p99_ms", "alloc_peak_kib"):
+            if reference[metric] and result[metric] > reference[metric] * (1 + threshold):
+                regressions.append(
+                    f"{name}: {metric} {result[metric]:.3f} > baseline {reference[metric]:.3f}"
+                )
+        if result["throughput_rps"] < reference["throughput_rps"] * (1 - threshold):
+            regressions.append(
+                f"{name}: throughput_rps {result['throughput_rps']:.1f} < baseline "
+                f"{reference['throughput_rps']:.1f}"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.harness")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="прогнать стенд")
+    run.add_argument("--rows", default="1k", help="1k, 10k, 100k, 1m или число")
+    run.add_argument("--requests", type=int, default=500)
+    run.add_argument("--concurrency", type=int, default=1)
+    run.add_argument("--warmup", type=int, default=20)
+    run.add_argument("--contacts-cap", type=int, default=10_000)
+    run.add_argument("--endpoints", default="", help="список через запятую")
+    run.add_argument("--output", type=Path)
+    run.add_argument("--save", metavar="BASELINE", help="сохранить результат как baseline")
+
+    cmp = commands.add_parser("compare", help="сравнить результат с baseline")
+    cmp.add_argument("result", type=Path)
+    cmp.add_argument("--baseline", required=True)
+    cmp.add_argument("--threshold", type=float, default=0.10)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        result = asyncio.run(run_suite(args))
+        if args.output:
+            args.output.write_text(json.dumps(result, indent=2))
+        if args.save:
+            BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+            (BASELINE_DIR / f"{args.save}.json").write_text(json.dumps(result, indent=2))
+        return 0
+
+    baseline_path = find_baseline(args.baseline)
+    if baseline_path is None:
+        available = sorted(path.stem for path in BASELINE_DIR.glob("*.json"))
+        print(
+            f"baseline {args.baseline!r} not found in {BASELINE_DIR} "
+            f"(available: {', '.join(available) or 'none'}); record one with\n"
+            f"    python -m benchmarks.harness run --rows 10k --requests 1000 --save {args.baseline}",
+            file=sys.stderr
+        )
+        return 2
+    current = json.loads(args.result.read_text())
+    regressions = compare(current, json.loads(baseline_path.read_text()), args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if not regressions:
+        print(f"no regressions against {baseline_path.name} (threshold {args.threshold:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
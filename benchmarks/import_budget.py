@@ -0,0 +1,76 @@
+"""Бюджет на импорт app.main: время по `python -X importtime` и список запрещённых модулей.
+
+    python -m benchmarks.import_budget [budget_ms]
+
+Печатает самые дорогие модули. Время импорта сильно зависит от машины,
+поэтому оно проверяется, только если бюджет передан явно; запрещённые
+модули проверяются всегда, и то же самое делает tests/test_import_budget.py.
+"""
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+
+TOP = 15
+
+# Нужны только сборке ассетов, профилированию, запуску сервера или
+# включённой шине инвалидации через Postgres
+FORBIDDEN = ("app.core.frontend", "app.core.profiling", "cProfile", "app.core.server", "asyncpg")
+
+
+def measure(target: str = "app.main") -> Dict[str, Tuple[int, int]]:
+    """Возвращает {модуль: (self_us, cumulative_us)} для одного холодного импорта"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    modules: Dict[str, Tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def check(
+    modules: Dict[str, Tuple[int, int]],
+    budget_ms: Optional[float] = None,
+    target: str = "app.main"
+) -> List[str]:
+    problems = []
+    total_ms = modules[target][1] / 1000
+    if budget_ms is not None and total_ms > budget_ms:
+        problems.append(f"import {target} took {total_ms:.0f} ms, budget {budget_ms:.0f} ms")
+    for name in FORBIDDEN:
+        if name in modules:
+            problems.append(f"{name} is imported eagerly")
+    return problems
+
+
+def main(budget_ms: Optional[float] = None) -> int:
+    modules = measure()
+    print(f"{'cumulative ms':>14} {'self ms':>8}  module")
+    for name, (self_us, cumulative_us) in sorted(
+        modules.items(), key=lambda item: item[1][1], reverse=True
+    )[:TOP]:
+        print(f"{cumulative_us / 1000:14.1f} {self_us / 1000:8.1f}  {name}")
+
+    problems = check(modules, budget_ms)
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    if not problems:
+        total_ms = modules["app.main"][1] / 1000
+        print(f"OK: app.main imported in {total_ms:.0f} ms"
+              + (f", budget {budget_ms:.0f} ms" if budget_ms is not None else ""))
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(float(sys.argv[1]) if len(sys.argv) > 1 else None))
@@ -0,0 +1,103 @@
+"""Шина инвалидации на LocalTransport: задержка доставки и потерянные сообщения.
+
+    python -m benchmarks.invalidation_benchmark [workers] [events]
+
+Воркеры — отдельные процессы со своей шиной в общем временном каталоге.
+Издатель ставит события в очередь публикации (invalidate() из запроса не
+ждёт транспорт) и замеряет, когда последнее применили все воркеры. Затем
+одна версия «теряется» (счётчик увеличен, сообщение не отправлено):
+следующее событие должно вызвать у воркеров полный сброс, а потерю
+последнего сообщения должна поймать периодическая сверка версий.
+"""
+import asyncio
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.core.invalidation import InvalidationBus, LocalTransport
+
+
+POLL_INTERVAL = 0.5
+
+
+def worker(directory: Path, results, ready, stop) -> None:
+    async def main() -> None:
+        bus = InvalidationBus(LocalTransport(directory), poll_interval=POLL_INTERVAL)
+        bus.subscribe(
+            "pages",
+            lambda key: results.put(("key", key, time.perf_counter())),
+            lambda: results.put(("flush", None, time.perf_counter()))
+        )
+        task = asyncio.create_task(bus.run())
+        while not directory.joinpath(f"worker-{multiprocessing.current_process().pid}.sock").exists():
+            await asyncio.sleep(0.01)
+        ready.release()
+        while not stop.is_set():
+            await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(main())
+
+
+def collect(results, kind: str, count: int, timeout: float = 5.0) -> list:
+    received = []
+    deadline = time.perf_counter() + timeout
+    while len(received) < count and time.perf_counter() < deadline:
+        try:
+            event = results.get(timeout=0.1)
+        except Exception:
+            continue
+        if event[0] == kind:
+            received.append(event)
+    return received
+
+
+def main(workers: int, events: int) -> None:
+    context = multiprocessing.get_context("fork")
+    directory = Path(tempfile.mkdtemp(prefix="invalidation-"))
+    results, ready, stop = context.Queue(), context.Semaphore(0), context.Event()
+    processes = [
+        context.Process(target=worker, args=(directory, results, ready, stop))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for _ in processes:
+        ready.acquire()
+
+    bus = InvalidationBus(LocalTransport(directory))
+    start = time.perf_counter()
+    for page_id in range(events):
+        bus.invalidate("pages", page_id)
+    published = time.perf_counter()
+    delivered = collect(results, "key", workers * events)
+    last = max((at for _, _, at in delivered), default=published)
+    print(f"{workers} workers x {events} events: queued in {(published - start) * 1000:.1f} ms, "
+          f"delivered {len(delivered)}/{workers * events}, last after {(last - start) * 1000:.1f} ms")
+
+    bus.transport.next_version("pages")
+    bus.invalidate("pages", "after-gap")
+    flushes = collect(results, "flush", workers)
+    print(f"gap in versions: {len(flushes)}/{workers} workers flushed")
+
+    bus.transport.next_version("pages")
+    lost = time.perf_counter()
+    flushes = collect(results, "flush", workers, timeout=POLL_INTERVAL * 4)
+    caught = max((at for _, _, at in flushes), default=lost)
+    print(f"lost last message: {len(flushes)}/{workers} workers flushed "
+          f"after {(caught - lost) * 1000:.0f} ms (poll interval {POLL_INTERVAL * 1000:.0f} ms)")
+
+    bus.close()
+    stop.set()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 4,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    )
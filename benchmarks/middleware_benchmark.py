@@ -0,0 +1,70 @@
+"""Накладные расходы MetricsMiddleware против пустого @app.middleware("http").
+
+    python -m benchmarks.middleware_benchmark [requests]
+"""
+import asyncio
+import sys
+import time
+
+from fastapi import FastAPI, Request
+
+from app.core.metrics import MetricsMiddleware, MetricsRegistry
+
+
+def make_app(kind: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    if kind == "base_http":
+        @app.middleware("http")
+        async def log_requests(request: Request, call_next):
+            return await call_next(request)
+    elif kind == "metrics":
+        app.add_middleware(MetricsMiddleware, registry=MetricsRegistry())
+    return app
+
+
+async def drive(app: FastAPI, requests: int) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/health",
+        "raw_path": b"/health",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(200):
+        await app(dict(scope), receive, send)
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+def main(requests: int) -> None:
+    baseline = None
+    for kind in ("none", "base_http", "metrics"):
+        per_request = asyncio.run(drive(make_app(kind), requests))
+        baseline = baseline or per_request
+        print(f"{kind:10} {per_request:8.1f} us/request  (+{per_request - baseline:6.1f} us)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
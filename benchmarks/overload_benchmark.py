@@ -0,0 +1,105 @@
+"""Goodput под перегрузкой: без ограничения против AdmissionMiddleware.
+
+    python -m benchmarks.overload_benchmark [seconds]
+
+Эндпоинт имитирует синхронный запрос к БД (time.sleep в пуле потоков).
+Запросы приходят с постоянной частотой (открытая модель) от 0.5x до 4x
+ёмкости; goodput — успешные ответы, уложившиеся в SLO клиента. Без
+ограничения очередь в пуле потоков растёт, и при перегрузке почти все
+ответы опаздывают; с ним лишнее быстро получает 503, а остальное
+обслуживается вовремя.
+"""
+import asyncio
+import sys
+import time
+
+from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.admission import AdmissionMiddleware
+
+
+SERVICE_TIME = 0.05
+THREADS = 40  # размер пула потоков anyio по умолчанию
+CAPACITY = THREADS / SERVICE_TIME
+SLO = 0.5
+
+
+def make_app(limited: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/pages")
+    async def pages():
+        await run_in_threadpool(time.sleep, SERVICE_TIME)
+        return {"ok": True}
+
+    if limited:
+        app.add_middleware(
+            AdmissionMiddleware,
+            max_in_flight=THREADS,
+            class_limits={},
+            queue_size=THREADS * 2,
+            queue_timeout=SLO / 2
+        )
+    return app
+
+
+async def request(app: FastAPI) -> tuple:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/pages",
+        "raw_path": b"/pages",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return status, time.perf_counter() - start
+
+
+async def drive(app: FastAPI, rate: float, seconds: float) -> tuple:
+    tasks = []
+    interval = 1 / rate
+    start = time.perf_counter()
+    for i in range(int(rate * seconds)):
+        delay = start + i * interval - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(request(app)))
+    results = await asyncio.gather(*tasks)
+    good = sum(1 for status, latency in results if status == 200 and latency <= SLO)
+    shed = sum(1 for status, _ in results if status == 503)
+    latencies = sorted(latency for status, latency in results if status == 200)
+    p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else 0.0
+    return good / seconds, shed / seconds, p99
+
+
+def main(seconds: float) -> None:
+    print(f"capacity ~{CAPACITY:.0f} req/s, SLO {SLO * 1000:.0f} ms")
+    print(f"{'load':>6} {'mode':>10} {'goodput/s':>10} {'503/s':>8} {'p99 ms':>8}")
+    for factor in (0.5, 1.0, 2.0, 4.0):
+        for limited in (False, True):
+            goodput, shed, p99 = asyncio.run(drive(make_app(limited), CAPACITY * factor, seconds))
+            mode = "admission" if limited else "unlimited"
+            print(f"{factor:5.1f}x {mode:>10} {goodput:10.0f} {shed:8.0f} {p99 * 1000:8.0f}")
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 3.0)
@@ -0,0 +1,116 @@
+"""Пропускная способность pre-fork сервера в зависимости от числа воркеров.
+
+    python -m benchmarks.scaling_benchmark [--workers 1,2,4,8] [--path /health]
+
+Для каждого значения поднимает `python -m app.main --workers N` на свободном
+порту, гоняет keep-alive GET-запросы из нескольких клиентских процессов и
+печатает req/s. Клиенты работают на той же машине, поэтому при числе
+воркеров, близком к числу ядер, они начинают конкурировать с сервером.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from typing import List
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(port: int, path: str, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1) as sock:
+                sock.sendall(f"GET {path} HTTP/1.1\r\nHost: bench\r\nConnection: close\r\n\r\n".encode())
+                if sock.recv(12).startswith(b"HTTP/1.1 200"):
+                    return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not come up")
+
+
+async def connection(port: int, path: str, deadline: float) -> int:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    request = f"GET {path} HTTP/1.1\r\nHost: bench\r\n\r\n".encode()
+    done = 0
+    while time.monotonic() < deadline:
+        writer.write(request)
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":", 1)[1])
+        await reader.readexactly(length)
+        done += 1
+    writer.close()
+    return done
+
+
+def client(port: int, path: str, connections: int, duration: float, results) -> None:
+    async def drive() -> int:
+        deadline = time.monotonic() + duration
+        counts = await asyncio.gather(*(connection(port, path, deadline) for _ in range(connections)))
+        return sum(counts)
+
+    results.put(asyncio.run(drive()))
+
+
+def measure(workers: int, path: str, clients: int, connections: int, duration: float) -> float:
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.main", "--port", str(port), "--workers", str(workers)],
+        env={**os.environ, "LOG_LEVEL": "WARNING"},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_until_up(port, path)
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=client, args=(port, path, connections, duration, results))
+            for _ in range(clients)
+        ]
+        for process in processes:
+            process.start()
+        total = sum(results.get() for _ in processes)
+        for process in processes:
+            process.join()
+        return total / duration
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+
+def main(argv: List[str] = None) -> None:
+    cores = os.cpu_count() or 1
+    default_workers = sorted({1, 2, 4, 8, 16, cores} & set(range(1, cores + 1)))
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", default=",".join(map(str, default_workers)))
+    parser.add_argument("--path", default="/health")
+    parser.add_argument("--clients", type=int, default=max(cores // 2, 1))
+    parser.add_argument("--connections", type=int, default=32, help="keep-alive connections per client")
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    baseline = None
+    print(f"{'workers':>7} {'req/s':>10} {'speedup':>8}")
+    for workers in (int(n) for n in args.workers.split(",")):
+        rate = measure(workers, args.path, args.clients, args.connections, args.duration)
+        baseline = baseline or rate
+        print(f"{workers:7d} {rate:10.0f} {rate / baseline:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Полнотекстовый поиск против LIKE-скана на синтетических страницах.
+
+    python -m benchmarks.search_benchmark [pages] [database_url]
+"""
+import itertools
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import Base, Page, PageMeta
+from app.db.search import create_search_index, get_page_search
+
+
+def make_vocabulary(size: int = 20_000) -> list:
+    rng = random.Random(7)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choices(letters, k=rng.randint(4, 10))) for _ in range(size)]
+
+
+WORDS = make_vocabulary()
+# Распределение, близкое к закону Ципфа: редкие слова встречаются редко
+CUM_WEIGHTS = list(itertools.accumulate(1 / rank for rank in range(1, len(WORDS) + 1)))
+QUERIES = [WORDS[50], f"{WORDS[200]} {WORDS[300]}", WORDS[2000], WORDS[5000][:4], WORDS[10]]
+
+
+def seed(session, pages: int) -> None:
+    rng = random.Random(42)
+    batch = []
+    for i in range(1, pages + 1):
+        batch.append({
+            "id": i,
+            "title": " ".join(rng.choices(WORDS, cum_weights=CUM_WEIGHTS, k=5)),
+            "slug": f"page-{i}",
+            "content": " ".join(rng.choices(WORDS, cum_weights=CUM_WEIGHTS, k=300)),
+            "is_published": True,
+        })
+        if len(batch) == 5000:
+            session.execute(Page.__table__.insert(), batch)
+            batch = []
+    if batch:
+        session.execute(Page.__table__.insert(), batch)
+    session.execute(
+        PageMeta.__table__.insert(),
+        [{"page_id": i, "keywords": " ".join(rng.choices(WORDS, cum_weights=CUM_WEIGHTS, k=3))} for i in range(1, pages + 1, 10)]
+    )
+    session.commit()
+
+
+def measure(fn, repeat: int = 20) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main(pages: int, database_url: str) -> None:
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    create_search_index(engine)
+    session = sessionmaker(bind=engine)()
+
+    start = time.perf_counter()
+    seed(session, pages)
+    index = get_page_search(session)
+    index.rebuild()
+    print(f"seeded and indexed {pages} pages in {time.perf_counter() - start:.1f}s")
+
+    for query in QUERIES:
+        def like_scan():
+            pattern = f"%{query.split()[0]}%"
+            session.execute(
+                text(
+                    "SELECT id FROM pages WHERE title LIKE :p OR content LIKE :p "
+                    "ORDER BY created_at DESC LIMIT 20"
+                ),
+                {"p": pattern}
+            ).all()
+
+        fts = measure(lambda: index.search(query, limit=20))
+        like = measure(like_scan, repeat=3)
+        print(f"{query!r:24} fts {fts:8.2f} ms   like {like:8.2f} ms")
+
+
+if __name__ == "__main__":
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    if len(sys.argv) > 2:
+        database_url = sys.argv[2]
+    else:
+        database_url = f"sqlite:///{tempfile.mkdtemp()}/search_benchmark.db"
+    main(pages, database_url)
@@ -0,0 +1,77 @@
+"""Сериализация списка из 1000 страниц: старый путь против TypeAdapter.dump_json.
+
+    python -m benchmarks.serialization_benchmark [items]
+"""
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.core.serialization import json_response, validate
+from app.schemas.page import PageInDB, PageWithMeta
+from app.services.page_service import page_row
+
+
+def make_rows(count: int) -> list:
+    now = datetime.utcnow()
+    return [
+        SimpleNamespace(
+            id=i,
+            title=f"Page {i}",
+            slug=f"page-{i}",
+            content="lorem ipsum " * 200,
+            is_published=True,
+            created_at=now,
+            updated_at=now,
+            meta=SimpleNamespace(meta_title=f"Page {i}", meta_description="description", keywords="a, b")
+            if i % 2 else None,
+        )
+        for i in range(count)
+    ]
+
+
+def legacy(rows: list, field) -> bytes:
+    items = []
+    for page in rows:
+        meta_data = {
+            "meta_title": page.meta.meta_title if page.meta else None,
+            "meta_description": page.meta.meta_description if page.meta else None,
+            "keywords": page.meta.keywords if page.meta else None,
+        }
+        page_dict = PageInDB.model_validate(page, from_attributes=True).model_dump()
+        items.append(PageWithMeta(**page_dict, **meta_data))
+    content = asyncio.run(serialize_response(field=field, response_content=items, is_coroutine=True))
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def fast(rows: list) -> bytes:
+    items = validate(List[PageWithMeta], [page_row(page) for page in rows])
+    return json_response(List[PageWithMeta], items, validated=True).body
+
+
+def measure(fn, repeat: int = 15) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main(count: int) -> None:
+    rows = make_rows(count)
+    field = create_model_field(name="Response", type_=List[PageWithMeta], mode="serialization")
+    print(f"legacy   {measure(lambda: legacy(rows, field)):8.2f} ms for {count} pages")
+    print(f"adapter  {measure(lambda: fast(rows)):8.2f} ms for {count} pages")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
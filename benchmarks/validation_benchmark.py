@@ -0,0 +1,99 @@
+"""Пропускная способность валидации: прежние схемы на pydantic.v1 против нативных v2.
+
+    python -m benchmarks.validation_benchmark [iterations]
+
+Со старым кодом pydantic 2 не стартует (`Field(regex=...)` — ошибка), поэтому
+«до» воспроизведено копиями схем на слое совместимости `pydantic.v1`.
+"""
+import re
+import sys
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Callable, Optional
+
+from pydantic import v1
+
+from app.api.v1.endpoints.contacts import ContactCreate, ContactResponse
+from app.db.models import PageInDB
+
+
+class LegacyContactBase(v1.BaseModel):
+    name: str = v1.Field(..., min_length=2, max_length=50)
+    email: v1.EmailStr
+    phone: Optional[str] = v1.Field(None, min_length=10, max_length=20, regex=r"^\+?[0-9\s\-\(\)]+$")
+    message: Optional[str] = v1.Field(None, max_length=1000)
+
+    @v1.validator("phone")
+    def validate_phone(cls, v):
+        if v is None:
+            return v
+        cleaned = re.sub(r"[^\d+]", "", v)
+        if not 10 <= len(cleaned) <= 15:
+            raise ValueError("Invalid phone number length")
+        return cleaned
+
+
+class LegacyContactResponse(LegacyContactBase):
+    id: int
+    created_at: datetime
+    is_processed: bool = False
+
+    class Config:
+        orm_mode = True
+
+
+class LegacyPageInDB(v1.BaseModel):
+    title: str
+    slug: str
+    content: Optional[str] = None
+    is_published: bool = True
+    id: int
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+CONTACT = {
+    "name": "Иван Иванов",
+    "email": "user@example.com",
+    "phone": "+7 (999) 123-45-67",
+    "message": "Хочу связаться",
+}
+CONTACT_ROW = SimpleNamespace(**CONTACT, id=1, created_at=datetime(2024, 1, 1), is_processed=False)
+PAGE_ROW = SimpleNamespace(
+    id=1, title="Title", slug="title", content="x" * 2000, is_published=True,
+    created_at=datetime(2024, 1, 1), updated_at=datetime(2024, 1, 2)
+)
+
+
+def rate(fn: Callable[[], object], iterations: int) -> float:
+    for _ in range(iterations // 10):
+        fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return iterations / (time.perf_counter() - start)
+
+
+def main(iterations: int) -> None:
+    legacy_contact = LegacyContactBase(**CONTACT)
+    contact = ContactCreate(**CONTACT)
+    cases = [
+        ("contact from dict", lambda: LegacyContactBase(**CONTACT), lambda: ContactCreate.model_validate(CONTACT)),
+        ("contact from orm", lambda: LegacyContactResponse.from_orm(CONTACT_ROW),
+         lambda: ContactResponse.model_validate(CONTACT_ROW)),
+        ("page from orm", lambda: LegacyPageInDB.from_orm(PAGE_ROW), lambda: PageInDB.model_validate(PAGE_ROW)),
+        ("contact dump", legacy_contact.dict, contact.model_dump),
+    ]
+    print(f"{'case':20} {'v1 ops/s':>12} {'v2 ops/s':>12} {'speedup':>8}")
+    for name, legacy, native in cases:
+        before = rate(legacy, iterations)
+        after = rate(native, iterations)
+        print(f"{name:20} {before:12.0f} {after:12.0f} {after / before:7.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,146 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.admission import AdmissionMiddleware
+from app.core.config import settings
+
+
+pytestmark = pytest.mark.anyio
+
+SERVICE_TIME = 0.1
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get(settings.API_V1_STR + "/pages/")
+    async def pages():
+        await run_in_threadpool(time.sleep, SERVICE_TIME)
+        return {"ok": True}
+
+    @app.get("/healthX")
+    async def not_health():
+        await run_in_threadpool(time.sleep, SERVICE_TIME)
+        return {"ok": True}
+
+    app.add_middleware(
+        AdmissionMiddleware,
+        max_in_flight=2,
+        class_limits={},
+        queue_size=1,
+        queue_timeout=SERVICE_TIME / 2
+    )
+    return app
+
+
+async def burst(path: str, count: int = 20, headers: dict = None) -> list:
+    transport = httpx.ASGITransport(app=make_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        responses = await asyncio.gather(*(client.get(path, headers=headers) for _ in range(count)))
+    return sorted(response.status_code for response in responses)
+
+
+async def test_overload_is_shed_with_503():
+    statuses = await burst(settings.API_V1_STR + "/pages/")
+    assert statuses.count(200) <= 3
+    assert statuses.count(503) >= 17
+
+
+async def test_shed_response_has_retry_after():
+    transport = httpx.ASGITransport(app=make_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        responses = await asyncio.gather(
+            *(client.get(settings.API_V1_STR + "/pages/") for _ in range(5))
+        )
+    rejected = [response for response in responses if response.status_code == 503]
+    assert rejected
+    assert rejected[0].headers["retry-after"] == "1"
+
+
+async def test_accept_header_does_not_bypass_admission():
+    statuses = await burst(settings.API_V1_STR + "/pages/", headers={"Accept": "text/event-stream"})
+    assert statuses.count(503) >= 17
+
+
+async def test_exempt_paths_match_exactly():
+    statuses = await burst("/healthX")
+    assert statuses.count(503) >= 17
+
+
+def test_stream_route_is_exempt():
+    scope = {"type": "http", "path": settings.API_V1_STR + "/contacts/stream", "headers": []}
+    assert AdmissionMiddleware._exempt(scope)
+    assert AdmissionMiddleware._exempt({**scope, "path": "/health"})
+    assert not AdmissionMiddleware._exempt({**scope, "path": "/healthcheck"})
+
+
+def test_mounted_stream_route_is_exempt():
+    from app.api.v1.endpoints import contacts
+
+    app = FastAPI()
+    app.include_router(contacts.router, prefix=settings.API_V1_STR + "/contacts")
+    path = app.url_path_for("stream_contacts")
+    assert AdmissionMiddleware._exempt({"type": "http", "path": path, "headers": []})
+
+
+# Синтетический бэкенд с фиксированной ёмкостью: семафор вместо пула
+# соединений, asyncio.sleep вместо запроса — время не зависит от машины
+BACKEND_SLOTS = 4
+BACKEND_TIME = 0.02
+DEADLINE = 0.25
+
+
+def make_backend_app(limited: bool) -> FastAPI:
+    app = FastAPI()
+    slots = asyncio.Semaphore(BACKEND_SLOTS)
+
+    @app.get("/pages")
+    async def pages():
+        async with slots:
+            await asyncio.sleep(BACKEND_TIME)
+        return {"ok": True}
+
+    if limited:
+        app.add_middleware(
+            AdmissionMiddleware,
+            max_in_flight=BACKEND_SLOTS,
+            class_limits={},
+            queue_size=BACKEND_SLOTS * 2,
+            queue_timeout=DEADLINE / 3
+        )
+    return app
+
+
+async def overload(app: FastAPI, factor: float = 3.0, seconds: float = 0.5) -> list:
+    from benchmarks.overload_benchmark import request
+
+    rate = factor * BACKEND_SLOTS / BACKEND_TIME
+    tasks = []
+    start = time.perf_counter()
+    for i in range(int(rate * seconds)):
+        delay = start + i / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(request(app)))
+    return await asyncio.gather(*tasks)
+
+
+async def test_goodput_holds_under_overload():
+    unlimited = await overload(make_backend_app(limited=False))
+    limited = await overload(make_backend_app(limited=True))
+
+    def goodput(results):
+        return sum(1 for status, latency in results if status == 200 and latency <= DEADLINE)
+
+    # Без ограничения очередь растёт и большинство ответов опаздывает
+    assert goodput(unlimited) < len(unlimited) / 2
+    # С ограничением лишнее получает 503, а принятое укладывается в срок
+    completed = [latency for status, latency in limited if status == 200]
+    assert all(latency <= DEADLINE for latency in completed)
+    assert any(status == 503 for status, _ in limited)
+    assert goodput(limited) > goodput(unlimited)
@@ -0,0 +1,69 @@
+import pytest
+from jinja2 import Environment, FileSystemLoader
+
+from app.core.assets import AssetManifest
+from app.core.config import settings
+from app.core.frontend import PAGES, FrontendBuilder, first_paint_cost
+
+
+# Исходный index.html: 894136 байт и 17 запросов до первой отрисовки,
+# после сборки — 854987 байт и 4 запроса
+FIRST_PAINT_BYTES = 860_000
+FIRST_PAINT_REQUESTS = 4
+
+
+@pytest.fixture(scope="module")
+def built(tmp_path_factory):
+    build_dir = tmp_path_factory.mktemp("build")
+    manifest = AssetManifest(
+        roots={
+            "static": settings.STATIC_DIR,
+            "assets": settings.TEMPLATE_DIR / "assets",
+        },
+        build_dir=build_dir / "assets"
+    ).build()
+    FrontendBuilder(
+        manifest=manifest,
+        template_dir=settings.TEMPLATE_DIR,
+        build_dir=build_dir / "templates"
+    ).build()
+    return manifest, build_dir / "templates"
+
+
+def render(directory, page: str, manifest: AssetManifest) -> str:
+    env = Environment(loader=FileSystemLoader(str(directory)))
+    env.globals["asset_url"] = manifest.url_for
+    return env.get_template(page).render()
+
+
+@pytest.mark.parametrize("page", PAGES)
+def test_first_paint_budget(built, page):
+    manifest, template_dir = built
+    total_bytes, requests = first_paint_cost(render(template_dir, page, manifest), manifest)
+
+    assert requests <= FIRST_PAINT_REQUESTS
+    assert total_bytes <= FIRST_PAINT_BYTES
+
+
+@pytest.mark.parametrize("page", PAGES)
+def test_build_improves_on_source_template(built, page):
+    manifest, template_dir = built
+    source = first_paint_cost(render(settings.TEMPLATE_DIR, page, manifest), manifest)
+    optimised = first_paint_cost(render(template_dir, page, manifest), manifest)
+
+    assert optimised[0] < source[0]
+    assert optimised[1] < source[1]
+
+
+def test_critical_css_is_not_parsed_as_jinja(tmp_path):
+    (tmp_path / "page.html").write_text(
+        '<html><head></head><body><h1 class="title">Hi</h1><main></main></body></html>',
+        encoding="utf-8"
+    )
+    builder = FrontendBuilder(manifest=None, template_dir=tmp_path, build_dir=tmp_path / "build")
+    builder.bundles["site.css"] = '.title{content:"{{ x }} {% if %} {#"}'
+    builder._build_page("page.html", "site.css")
+
+    env = Environment(loader=FileSystemLoader(str(tmp_path / "build")))
+    env.globals["asset_url"] = lambda path: "/" + path
+    assert '.title{content:"{{ x }} {% if %} {#"}' in env.get_template("page.html").render()
@@ -0,0 +1,17 @@
+import pytest
+
+from benchmarks.import_budget import FORBIDDEN, measure
+
+
+@pytest.fixture(scope="module")
+def modules():
+    # Холодный импорт в отдельном процессе: в этом app.main мог быть уже загружен
+    return measure("app.main")
+
+
+# Абсолютное время импорта здесь не проверяется: на одной машине разброс
+# больше, чем выигрыш от отложенных импортов. Выигрыш держится на том, что
+# тяжёлые модули не загружаются при импорте воркера
+@pytest.mark.parametrize("name", FORBIDDEN)
+def test_module_is_not_imported_eagerly(modules, name):
+    assert name not in modules
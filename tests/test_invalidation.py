@@ -0,0 +1,94 @@
+import anyio
+import pytest
+
+from app.core import invalidation
+from app.core.invalidation import InvalidationBus, LocalTransport
+
+
+pytestmark = pytest.mark.anyio
+
+
+class Recorder:
+
+    def __init__(self):
+        self.keys = []
+        self.flushes = 0
+
+
+    def on_key(self, key: str) -> None:
+        self.keys.append(key)
+
+
+    def on_flush(self) -> None:
+        self.flushes += 1
+
+
+async def wait_for(condition, timeout: float = 5.0) -> None:
+    with anyio.fail_after(timeout):
+        while not condition():
+            await anyio.sleep(0.01)
+
+
+@pytest.fixture
+def publisher(tmp_path):
+    bus = InvalidationBus(LocalTransport(tmp_path, name="publisher"))
+    yield bus
+    bus.close()
+
+
+async def start_worker(tg, tmp_path, poll_interval: float = 30.0):
+    transport = LocalTransport(tmp_path, name="worker")
+    bus = InvalidationBus(transport, poll_interval=poll_interval)
+    recorder = Recorder()
+    bus.subscribe("pages", recorder.on_key, recorder.on_flush)
+    tg.start_soon(bus.run)
+    await wait_for(transport.socket_path.exists)
+    return bus, recorder
+
+
+async def test_events_are_delivered_in_order(tmp_path, publisher):
+    async with anyio.create_task_group() as tg:
+        bus, recorder = await start_worker(tg, tmp_path)
+        for page_id in range(50):
+            publisher.invalidate("pages", page_id)
+
+        await wait_for(lambda: len(recorder.keys) == 50)
+        assert recorder.keys == [str(page_id) for page_id in range(50)]
+        assert recorder.flushes == 0
+        assert bus.seen["pages"] == 50
+        tg.cancel_scope.cancel()
+
+
+async def test_version_gap_flushes_topic(tmp_path, publisher):
+    async with anyio.create_task_group() as tg:
+        _, recorder = await start_worker(tg, tmp_path)
+        publisher.invalidate("pages", 1)
+        await wait_for(lambda: recorder.keys == ["1"])
+
+        # Версия израсходована, сообщение потеряно
+        publisher.transport.next_version("pages")
+        publisher.invalidate("pages", 3)
+
+        await wait_for(lambda: recorder.flushes == 1)
+        assert recorder.keys == ["1"]
+        tg.cancel_scope.cancel()
+
+
+async def test_lost_last_message_is_caught_by_poll(tmp_path, publisher):
+    async with anyio.create_task_group() as tg:
+        bus, recorder = await start_worker(tg, tmp_path, poll_interval=0.1)
+        publisher.transport.next_version("pages")
+
+        await wait_for(lambda: recorder.flushes == 1)
+        assert recorder.keys == []
+        assert bus.seen["pages"] == 1
+        tg.cancel_scope.cancel()
+
+
+def test_auto_transport_follows_worker_count(monkeypatch):
+    monkeypatch.setattr(invalidation.settings, "INVALIDATION_TRANSPORT", "auto")
+    monkeypatch.setattr(invalidation, "worker_count", 1)
+    assert invalidation.transport_name() == "none"
+
+    monkeypatch.setattr(invalidation, "worker_count", 4)
+    assert invalidation.transport_name() == "local"
@@ -0,0 +1,56 @@
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+
+from app.core.config import settings
+from app.core.metrics import MetricsMiddleware, MetricsRegistry, OTHER_METHOD, authorize_scrape
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+@pytest.fixture
+def app(registry):
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, registry=registry)
+
+    @app.api_route("/items/{item_id}", methods=["GET", "POST"])
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    @app.get("/metrics", dependencies=[Depends(authorize_scrape)])
+    async def read_metrics():
+        return registry.render()
+
+    return app
+
+
+def client(app) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://testserver")
+
+
+async def test_unknown_methods_share_one_label(app, registry):
+    async with client(app) as c:
+        await c.get("/items/1")
+        for i in range(20):
+            await c.request(f"BREW{i}", "/items/1")
+
+    assert {method for _, method in registry.routes} == {"GET", OTHER_METHOD}
+    assert registry.routes[("/items/{item_id}", OTHER_METHOD)].count == 20
+
+
+async def test_metrics_token(monkeypatch, app):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "secret")
+    async with client(app) as c:
+        assert (await c.get("/metrics")).status_code == 401
+        assert (await c.get("/metrics", headers={"Authorization": "Bearer wrong"})).status_code == 401
+        assert (await c.get("/metrics", headers={"Authorization": "Bearer secret"})).status_code == 200
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", None)
+    async with client(app) as c:
+        assert (await c.get("/metrics")).status_code == 200
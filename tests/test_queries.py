@@ -0,0 +1,77 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.db.instrumentation import assert_queries, capture_queries, instrument_engine
+from app.db.repositories import PageRepository
+from app.models import Page, PageMeta
+from app.services.page_service import PageService
+
+
+pytestmark = pytest.mark.anyio
+
+PAGES = 30
+
+
+@pytest.fixture
+def db(engine, session_factory):
+    instrument_engine(engine)
+    with session_factory() as db:
+        for i in range(1, PAGES + 1):
+            db.add(Page(id=i, title=f"Page {i}", slug=f"page-{i}", content="x", is_published=True))
+            db.add(PageMeta(page_id=i, meta_title=f"Page {i}", meta_description="about"))
+        db.commit()
+        yield db
+
+
+@pytest.fixture
+def service(db, session_factory):
+    return PageService(page_repo=PageRepository(Page, db), session_factory=session_factory)
+
+
+@pytest.mark.parametrize("fields", [
+    None,
+    frozenset({"id", "title", "slug"}),
+    frozenset({"id", "slug", "meta_description"}),
+])
+async def test_page_list_is_one_query(service, fields):
+    with assert_queries(max_count=1) as stats:
+        pages = await service.list_published_pages(fields)
+    assert stats.count == 1
+    assert len(pages) == PAGES
+
+
+@pytest.mark.parametrize("fields", [
+    None,
+    frozenset({"id", "title"}),
+    frozenset({"slug", "meta_title"}),
+])
+async def test_page_detail_is_one_query(service, fields):
+    # Чтение идёт в пуле потоков: ContextVar со статистикой туда переносится
+    with assert_queries(max_count=1) as stats:
+        page = await service.get_page_by_slug("page-7", fields)
+    assert stats.count == 1
+    assert set(page.model_dump()) == (fields or set(page.model_dump()))
+
+
+def test_lazy_relationship_in_loop_is_reported(db):
+    pages = db.query(Page).all()
+    with pytest.raises(AssertionError, match="N\\+1"):
+        with assert_queries(n_plus_one_threshold=5):
+            for page in pages:
+                page.meta
+
+
+def connection_state(db) -> dict:
+    return {key: repr(value) for key, value in db.connection().info.items()}
+
+
+def test_failed_query_leaves_no_state_on_connection(db):
+    state = connection_state(db)
+    with capture_queries() as stats:
+        with pytest.raises(OperationalError):
+            db.execute(text("SELECT * FROM missing_table"))
+        db.rollback()
+        db.execute(text("SELECT 1"))
+    assert stats.count == 1
+    assert connection_state(db) == state
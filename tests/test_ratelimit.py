@@ -0,0 +1,86 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.api.v1.endpoints import contacts
+from app.core import ratelimit
+from app.core.config import settings
+from app.core.ratelimit import LocalTokenBucketBackend, RateLimitPolicy
+
+
+POLICY = RateLimitPolicy(rate=1.0, burst=3)
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def backend(clock):
+    return LocalTokenBucketBackend(shards=1, max_keys=2, clock=clock)
+
+
+def test_burst_then_wait(backend):
+    assert [backend.take("a", POLICY) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert backend.take("a", POLICY) == pytest.approx(1.0)
+
+
+def test_tokens_refill_with_time(backend, clock):
+    for _ in range(3):
+        backend.take("a", POLICY)
+
+    clock.now += 0.5
+    assert backend.take("a", POLICY) == pytest.approx(0.5)
+    clock.now += 0.5
+    assert backend.take("a", POLICY) == 0.0
+    # Ведро не наполняется сверх burst
+    clock.now += 100
+    assert [backend.take("a", POLICY) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert backend.take("a", POLICY) > 0
+
+
+def test_least_recently_used_key_is_evicted(backend):
+    for key in ("a", "b"):
+        backend.take(key, POLICY)
+    backend.take("a", POLICY)
+    backend.take("c", POLICY)
+
+    assert len(backend) == 2
+    _, buckets = backend._shards[0]
+    assert list(buckets) == ["a", "c"]
+
+
+@pytest.mark.anyio
+async def test_contact_form_returns_429_with_retry_after(monkeypatch, clock):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(ratelimit.rate_limiter, "backend", LocalTokenBucketBackend(clock=clock))
+    app = FastAPI()
+    app.include_router(contacts.router, prefix=settings.API_V1_STR + "/contacts")
+    app.dependency_overrides[contacts.get_contact_storage] = contacts.ContactStorage
+
+    form = {"name": "Ivan", "email": "ivan@example.com"}
+    burst = ratelimit.POLICIES["contacts"].burst
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        for _ in range(burst):
+            response = await client.post("/api/v1/contacts/", json=form)
+            assert response.status_code == 201
+
+        response = await client.post("/api/v1/contacts/", json=form)
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "12"
+
+        clock.now += 12
+        response = await client.post("/api/v1/contacts/", json=form)
+        assert response.status_code == 201
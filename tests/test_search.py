@@ -0,0 +1,44 @@
+import pytest
+from fastapi import FastAPI
+
+from app.api.v1.endpoints import pages
+from app.core.config import settings
+from app.db.search import SqlitePageSearchIndex, create_search_index, render_snippet
+from app.models import Page
+
+
+@pytest.fixture
+def index(engine, session_factory):
+    with session_factory() as db:
+        db.add(Page(
+            id=1, title="Widgets", slug="widgets", is_published=True,
+            content='Cheap gizmos <script>alert("x")</script> & more'
+        ))
+        db.commit()
+    create_search_index(engine)
+    with session_factory() as db:
+        yield SqlitePageSearchIndex(db)
+
+
+def test_snippet_escapes_page_content(index):
+    total, hits = index.search("gizmos")
+
+    assert total == 1
+    snippet = hits[0]["snippet"]
+    assert "<mark>gizmos</mark>" in snippet
+    assert "<script>" not in snippet
+    assert "&lt;script&gt;" in snippet
+
+
+def test_render_snippet_keeps_only_own_markup():
+    assert render_snippet("<b>hit</b>") == "&lt;b&gt;<mark>hit</mark>&lt;/b&gt;"
+    assert render_snippet(None) is None
+
+
+def test_search_route_has_single_prefix():
+    app = FastAPI()
+    app.include_router(pages.router, prefix=settings.API_V1_STR + "/pages")
+    paths = {route.path for route in app.routes}
+
+    assert settings.API_V1_STR + "/pages/search" in paths
+    assert not any("/pages/pages" in path for path in paths)
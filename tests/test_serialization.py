@@ -0,0 +1,52 @@
+from itertools import combinations
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from app.core.serialization import (
+    ADAPTER_CACHE_SIZE,
+    PROJECTION_CACHE_SIZE,
+    json_response,
+    projection,
+    type_adapter,
+)
+
+
+class Item(BaseModel):
+    a: int = 0
+    b: int = 0
+    c: int = 0
+    d: int = 0
+    e: int = 0
+    f: int = 0
+    g: Optional[str] = None
+    h: Optional[str] = None
+    i: Optional[str] = None
+    j: Optional[str] = None
+
+
+def test_projection_keeps_only_requested_fields():
+    schema = projection(Item, frozenset({"a", "g"}))
+
+    assert set(schema.model_fields) == {"a", "g"}
+    assert projection(Item, None) is Item
+    assert projection(Item, frozenset(Item.model_fields)) is Item
+
+
+def test_adapter_cache_is_bounded_under_projection_churn():
+    names = list(Item.model_fields)
+    subsets = [
+        frozenset(subset)
+        for size in range(1, len(names))
+        for subset in combinations(names, size)
+    ]
+    assert len(subsets) > PROJECTION_CACHE_SIZE
+
+    type_adapter.cache_clear()
+    projection.cache_clear()
+    # Каждый проход заново создаёт вытесненные проекции
+    for _ in range(3):
+        for fields in subsets:
+            json_response(List[projection(Item, fields)], [{"a": 1}])
+
+    assert type_adapter.cache_info().currsize <= ADAPTER_CACHE_SIZE
@@ -0,0 +1,74 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import event
+
+from app.models import Page, PageMeta
+from app.services.page_service import PageService
+
+
+pytestmark = pytest.mark.anyio
+
+CONCURRENCY = 50
+
+
+@pytest.fixture
+def popular_page(session_factory):
+    with session_factory() as db:
+        page = Page(title="Popular", slug="popular", content="x" * 5000, is_published=True)
+        db.add(page)
+        db.flush()
+        db.add(PageMeta(page_id=page.id, meta_title="Popular", meta_description="Hot page"))
+        db.commit()
+
+
+@pytest.fixture
+def selects(engine):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+            # Медленный запрос: остальные вызовы успевают присоединиться
+            time.sleep(0.05)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def make_service(session_factory) -> PageService:
+    # Репозиторий запроса для чтения по slug не используется
+    return PageService(page_repo=None, session_factory=session_factory)
+
+
+async def test_concurrent_reads_run_one_select(session_factory, popular_page, selects):
+    services = [make_service(session_factory) for _ in range(CONCURRENCY)]
+    pages = await asyncio.gather(*(service.get_page_by_slug("popular") for service in services))
+
+    assert len(selects) == 1
+    assert all(page.slug == "popular" and page.meta_description == "Hot page" for page in pages)
+
+
+async def test_followers_get_result_when_leader_is_cancelled(session_factory, popular_page, selects):
+    leader = asyncio.ensure_future(make_service(session_factory).get_page_by_slug("popular"))
+    await asyncio.sleep(0)
+    followers = [
+        asyncio.ensure_future(make_service(session_factory).get_page_by_slug("popular"))
+        for _ in range(5)
+    ]
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    pages = await asyncio.gather(*followers)
+    assert [page.slug for page in pages] == ["popular"] * 5
+    assert len(selects) == 1
+
+
+async def test_sequential_reads_are_not_cached(session_factory, popular_page, selects):
+    service = make_service(session_factory)
+    await service.get_page_by_slug("popular")
+    await service.get_page_by_slug("popular")
+
+    assert len(selects) == 2
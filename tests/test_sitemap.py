@@ -0,0 +1,58 @@
+import re
+from urllib.parse import urlsplit
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.api.v1.endpoints import seo
+from app.models import Page, PageMeta
+from app.services.page_service import PageService, get_page_service
+from app.services.sitemap_service import SiteIndex
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def client(monkeypatch, session_factory):
+    with session_factory() as db:
+        db.add(Page(id=1, title="About", slug="about", content="x", is_published=True))
+        db.add(PageMeta(page_id=1, meta_title="About", meta_description="about us"))
+        db.add(Page(id=2, title="Draft", slug="draft", content="x", is_published=False))
+        db.commit()
+
+    monkeypatch.setattr(seo, "SessionLocal", session_factory)
+    monkeypatch.setattr(seo, "site_index", SiteIndex(base_url="http://testserver"))
+    app = FastAPI()
+    app.include_router(seo.router)
+    app.dependency_overrides[get_page_service] = lambda: PageService(
+        page_repo=None, session_factory=session_factory
+    )
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://testserver")
+
+
+async def test_sitemap_locations_resolve(client):
+    async with client:
+        sitemap = await client.get("/sitemap.xml")
+        locations = re.findall(r"<loc>([^<]+)</loc>", sitemap.text)
+        assert len(locations) == 1
+
+        page = await client.get(urlsplit(locations[0]).path)
+        assert page.status_code == 200
+        assert page.json()["slug"] == "about"
+
+
+async def test_feed_links_resolve(client):
+    async with client:
+        feed = await client.get("/feed.xml")
+        links = re.findall(r'<entry>.*?<link href="([^"]+)"', feed.text)
+        assert links
+
+        for link in links:
+            assert (await client.get(urlsplit(link).path)).status_code == 200
+
+
+async def test_unpublished_page_is_not_public(client):
+    async with client:
+        assert (await client.get("/pages/draft")).status_code == 404